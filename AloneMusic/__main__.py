@@ -14,21 +14,23 @@ from pytgcalls.exceptions import NoActiveGroupCall
 
 import config
 from AloneMusic import LOGGER, app, userbot
+from AloneMusic.core.autoend import auto_end
 from AloneMusic.core.call import Alone
+from AloneMusic.core.extractor import extractor
+from AloneMusic.core.health import monitor
+from AloneMusic.core.http import http
 from AloneMusic.misc import sudo
 from AloneMusic.plugins import ALL_MODULES
 from AloneMusic.utils.database import get_banned_users, get_gbanned
+from AloneMusic.utils.metadata import search_cache
+from AloneMusic.utils.stream.cache import media_cache
+from AloneMusic.utils.stream.prefetch import prefetcher
+from AloneMusic.utils.stream.speed import variants
 from config import BANNED_USERS
 
 
 async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
+    if not any(config.STRING_SESSIONS):
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
     await sudo()
@@ -41,6 +43,12 @@ async def init():
             BANNED_USERS.add(user_id)
     except:
         pass
+    await http.start()
+    await extractor.start()
+    media_cache.load()
+    variants.load()
+    await search_cache.start()
+    prefetcher.start()
     await app.start()
     for all_module in ALL_MODULES:
         importlib.import_module("AloneMusic.plugins" + all_module)
@@ -57,12 +65,20 @@ async def init():
     except:
         pass
     await Alone.decorators()
+    monitor.start()
+    auto_end.start(Alone.end_idle)
     LOGGER("AloneMusic").info(
         "ʙᴏᴛ sᴛᴀʀᴛᴇᴅ sᴜᴄᴄᴇssғᴜʟʟʏ, ɴᴏᴡ ɢɪʙ ʏᴏᴜʀ ɢɪʀʟғʀɪᴇɴᴅ ᴄʜᴜᴛ ɪɴ @TheAloneTeam"
     )
     await idle()
+    monitor.stop()
+    auto_end.stop()
     await app.stop()
     await userbot.stop()
+    prefetcher.stop()
+    extractor.stop()
+    await http.stop()
+    media_cache.flush()
     LOGGER("AloneMusic").info("Stopping 𝚻հҽ 𝚨Łꪮⲛ𝛆 🚩𝗧ε᧘‌ᴍ Bot...")
 
 
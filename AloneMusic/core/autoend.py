@@ -0,0 +1,157 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Iterable, Union
+
+from AloneMusic.utils.database import active, is_autoend
+
+from ..logger import LOGGER
+from .userbot import assistantids
+
+# how long a call may play to nobody before it is ended
+AUTO_END_AFTER = 60
+
+
+class AutoEnd:
+    """
+    Ends calls nobody is listening to, driven by participant updates.
+
+    The listeners of each call are kept from pytgcalls' participant updates.
+    When the last one leaves, or a call starts with nobody known to be in it,
+    a deadline ``AUTO_END_AFTER`` seconds away goes on a min-heap, and one
+    task sleeps until the earliest deadline and hands each expired call to a
+    task of its own. Someone joining cancels it. Updates only tell who came
+    and went, so a call whose listeners were never listed in full is checked
+    with ``get_participants`` when its deadline comes, instead of on join.
+    Whether auto-end is on is read from the cached setting.
+    """
+
+    def __init__(self, after: int = AUTO_END_AFTER):
+        self.after = after
+        self.listeners: dict[int, set[int]] = {}
+        # chats whose listeners were listed in full, not only from updates
+        self.seeded: set[int] = set()
+        self.deadlines: dict[int, float] = {}
+        # (deadline, chat_id), entries not matching ``deadlines`` are stale
+        self._heap: list[tuple[float, int]] = []
+        self._wake = asyncio.Event()
+        self._end: Union[Callable[[int, bool], Awaitable[bool]], None] = None
+        self._runner: Union[asyncio.Task, None] = None
+        self._expiring: dict[int, asyncio.Task] = {}
+        self.ended = 0
+
+    def arm(self, chat_id: int) -> None:
+        if chat_id in self.deadlines:
+            return
+        deadline = time.monotonic() + self.after
+        self.deadlines[chat_id] = deadline
+        heapq.heappush(self._heap, (deadline, chat_id))
+        if self._heap[0][1] == chat_id:
+            self._wake.set()
+
+    def disarm(self, chat_id: int) -> None:
+        # its heap entry is skipped once it comes up
+        self.deadlines.pop(chat_id, None)
+
+    async def watch(self, chat_id: int) -> None:
+        """A call started, end it if nobody turns up."""
+        if not self.listeners.get(chat_id) and await is_autoend():
+            self.arm(chat_id)
+
+    def seed(self, chat_id: int, user_ids: Iterable[int]) -> set:
+        """Replaces what is known about the call's listeners."""
+        listeners = {u for u in user_ids if u not in assistantids}
+        self.listeners[chat_id] = listeners
+        self.seeded.add(chat_id)
+        if listeners:
+            self.disarm(chat_id)
+        return listeners
+
+    def joined(self, chat_id: int, user_id: int) -> None:
+        if user_id in assistantids:
+            return
+        self.listeners.setdefault(chat_id, set()).add(user_id)
+        self.disarm(chat_id)
+
+    async def left(self, chat_id: int, user_id: int) -> None:
+        listeners = self.listeners.setdefault(chat_id, set())
+        listeners.discard(user_id)
+        if not listeners and chat_id in active and await is_autoend():
+            self.arm(chat_id)
+
+    def forget(self, chat_id: int) -> None:
+        self.listeners.pop(chat_id, None)
+        self.seeded.discard(chat_id)
+        self.disarm(chat_id)
+
+    async def _expire(self, chat_id: int) -> None:
+        try:
+            if not await is_autoend():
+                return
+            verify = chat_id not in self.seeded
+            if await self._end(chat_id, verify):
+                self.ended += 1
+                self.forget(chat_id)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Auto-end of {chat_id} failed: {e}")
+        finally:
+            self._expiring.pop(chat_id, None)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            timeout = None
+            now = time.monotonic()
+            while self._heap:
+                deadline, chat_id = self._heap[0]
+                if self.deadlines.get(chat_id) != deadline:
+                    heapq.heappop(self._heap)
+                    continue
+                if deadline > now:
+                    timeout = deadline - now
+                    break
+                heapq.heappop(self._heap)
+                self.deadlines.pop(chat_id, None)
+                # ending a call waits on its mailbox, that must not hold up
+                # the deadlines of other chats
+                if chat_id not in self._expiring:
+                    self._expiring[chat_id] = asyncio.create_task(self._expire(chat_id))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self, end: Callable[[int, bool], Awaitable[bool]]) -> None:
+        """
+        ``end(chat_id, verify)`` ends an idle call, after looking its
+        participants up first when ``verify`` is set, and tells if it did.
+        """
+        self._end = end
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._expiring.values()):
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "watched": len(self.listeners),
+            "armed": len(self.deadlines),
+            "ending": len(self._expiring),
+            "ended": self.ended,
+        }
+
+
+auto_end = AutoEnd()
@@ -0,0 +1,238 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Iterable, Union
+
+from ..logger import LOGGER
+
+# outcomes each backend's rolling stats are computed from
+BACKEND_WINDOW = 50
+# consecutive failures that open the breaker, and how long it stays open
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN = 30
+BREAKER_COOLDOWN_MAX = 10 * 60
+# a backend below this success rate is only tried after the healthy ones
+HEALTHY_RATE = 0.5
+# how long to wait for a backend before hedging with the next one
+HEDGE_DEFAULT = 4.0
+HEDGE_MIN = 0.5
+HEDGE_MAX = 15.0
+HEDGE_SAMPLES = 5
+
+
+class Backend:
+    def __init__(self, name: str):
+        self.name = name
+        self.outcomes = deque(maxlen=BACKEND_WINDOW)
+        self.latencies = deque(maxlen=BACKEND_WINDOW)
+        self.streak = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self.trial = False
+        self.hedged = 0
+        self.won = 0
+
+    @property
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def percentile(self, q: float) -> Union[float, None]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def hedge_delay(self) -> float:
+        if len(self.latencies) < HEDGE_SAMPLES:
+            return HEDGE_DEFAULT
+        return min(max(self.percentile(0.95), HEDGE_MIN), HEDGE_MAX)
+
+    @property
+    def state(self) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if self.open_until > time.monotonic() else "half-open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self.trial:
+            return False
+        # cool-off is over, let one request through to test the backend
+        self.trial = True
+        return True
+
+    def report(self, ok: bool, latency: float = None) -> None:
+        self.outcomes.append(ok)
+        if ok:
+            if latency is not None:
+                self.latencies.append(latency)
+            if self.open_until:
+                LOGGER(__name__).info(f"Backend {self.name} recovered.")
+            self.streak = 0
+            self.opened = 0
+            self.open_until = 0.0
+            self.trial = False
+            return
+        self.streak += 1
+        if self.trial or self.streak >= BREAKER_FAILURES:
+            cooldown = min(BREAKER_COOLDOWN * 2**self.opened, BREAKER_COOLDOWN_MAX)
+            self.opened += 1
+            self.open_until = time.monotonic() + cooldown
+            self.trial = False
+            LOGGER(__name__).warning(
+                f"Backend {self.name} failing, skipped for {cooldown}s."
+            )
+
+
+class BackendRouter:
+    """
+    Health and latency of the download backends, the external api and
+    yt-dlp.
+
+    A backend that fails ``BREAKER_FAILURES`` times in a row is skipped for a
+    cool-off that doubles each time it trips, then one trial request decides
+    whether it is back. Lookups are hedged: when the first backend has not
+    answered within its own recent p95 latency the next one is started as
+    well, and whichever answers first wins. The slower one is left to finish
+    so its outcome still counts.
+    """
+
+    def __init__(self):
+        self.backends: dict[str, Backend] = {}
+        # lookups that lost a hedge but are still running
+        self._losers: set[asyncio.Task] = set()
+
+    def get(self, name: str) -> Backend:
+        backend = self.backends.get(name)
+        if backend is None:
+            backend = self.backends[name] = Backend(name)
+        return backend
+
+    def report(self, name: str, ok: bool, latency: float = None) -> None:
+        self.get(name).report(ok, latency)
+
+    def rank(self, preferred: Iterable[str]) -> list[str]:
+        """``preferred`` reordered so that unhealthy backends come last."""
+        preferred = list(preferred)
+        return sorted(
+            preferred,
+            key=lambda n: (self.get(n).success_rate < HEALTHY_RATE, preferred.index(n)),
+        )
+
+    async def _call(self, name: str, fn: Callable[[], Awaitable]):
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # a cancelled trial proves nothing, the next request gets one
+            self.get(name).trial = False
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Backend {name} failed: {e}")
+            self.report(name, False)
+            return None
+        # None means the backend had nothing to try with, not that it failed
+        if result is not None:
+            self.report(name, True, time.monotonic() - started)
+        return result
+
+    @staticmethod
+    async def _first(tasks: dict, timeout: Union[float, None]):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while tasks:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            done, _ = await asyncio.wait(
+                tasks, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                return None
+            for task in done:
+                name = tasks.pop(task)
+                if task.result() is not None:
+                    return name, task.result()
+        return None
+
+    async def hedge(
+        self,
+        calls: list[tuple[str, Callable[[], Awaitable]]],
+        running: dict[str, asyncio.Task] = None,
+        hedged: bool = True,
+    ):
+        """
+        Run ``calls`` in order, each started once the ones before it failed
+        or, when ``hedged``, ran past their p95. Returns ``(name, result)`` of
+        the first that returns something other than None, or None if none did.
+
+        Lookups still running when one wins are left in ``running``; passing
+        it to the next hedge picks them up instead of starting them again.
+        """
+        running = {} if running is None else running
+        pending = list(calls)
+        tasks: dict[asyncio.Task, str] = {}
+        try:
+            while pending:
+                name, fn = pending.pop(0)
+                task = running.pop(name, None)
+                if task is None:
+                    if not self.get(name).allow():
+                        continue
+                    if tasks:
+                        self.get(name).hedged += 1
+                    task = asyncio.create_task(self._call(name, fn))
+                tasks[task] = name
+                if pending:
+                    delay = self.get(name).hedge_delay() if hedged else None
+                    winner = await self._first(tasks, delay)
+                    if winner:
+                        return self._won(winner, tasks, running)
+            if not tasks and calls:
+                # every breaker is open, try the one that reopens first
+                name, fn = min(calls, key=lambda c: self.get(c[0]).open_until)
+                tasks[asyncio.create_task(self._call(name, fn))] = name
+            winner = await self._first(tasks, None)
+            return self._won(winner, tasks, running) if winner else None
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def _won(self, winner: tuple, losers: dict, running: dict) -> tuple:
+        self.get(winner[0]).won += 1
+        for task, name in losers.items():
+            running[name] = task
+            self._losers.add(task)
+            task.add_done_callback(self._losers.discard)
+        return winner
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "name": b.name,
+                "state": b.state,
+                "success": round(b.success_rate * 100),
+                "p50": b.percentile(0.5),
+                "p95": b.percentile(0.95),
+                "hedged": b.hedged,
+                "won": b.won,
+                "reopens": max(0, int(b.open_until - now)),
+            }
+            for b in self.backends.values()
+        ]
+
+
+backends = BackendRouter()
@@ -8,41 +8,67 @@
 
 import asyncio
 import os
-from datetime import datetime, timedelta
+import time
+from collections import deque
+from datetime import datetime
 from typing import Union
 
 from ntgcalls import TelegramServerError
 from pyrogram import Client
-from pyrogram.errors import ChatAdminRequired, FloodWait
+from pyrogram.errors import (ChatAdminRequired, FloodWait, InviteRequestSent,
+                             UserAlreadyParticipant, UserNotParticipant)
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls
 from pytgcalls.exceptions import NoActiveGroupCall
-from pytgcalls.types import (AudioQuality, ChatUpdate, MediaStream,
-                             StreamEnded, Update, VideoQuality)
+from pytgcalls.types import (AudioQuality, ChatUpdate, GroupCallParticipant,
+                             MediaStream, StreamEnded, Update,
+                             UpdatedGroupCallParticipant, VideoQuality)
 
 import config
-from AloneMusic import LOGGER, YouTube, app
+from AloneMusic import LOGGER, YouTube, app, userbot
+from AloneMusic.core.autoend import auto_end
+from AloneMusic.core.mailbox import ADVANCE, STOP, mailboxes
+from AloneMusic.core.placement import placement
+from AloneMusic.core.userbot import session_strings
 from AloneMusic.misc import db
 from AloneMusic.utils.database import (add_active_chat, add_active_video_chat,
-                                       get_lang, get_loop, group_assistant,
-                                       is_autoend, music_on,
+                                       assistantdict, get_lang, get_loop,
+                                       group_assistant, music_on,
                                        remove_active_chat,
-                                       remove_active_video_chat, set_loop)
+                                       remove_active_video_chat,
+                                       set_assistant_new, set_loop)
+from AloneMusic.utils.downloader import PROGRESSIVE_PREBUFFER, downloader
 from AloneMusic.utils.exceptions import AssistantErr
-from AloneMusic.utils.formatters import (check_duration, seconds_to_min,
-                                         speed_converter)
+from AloneMusic.utils.formatters import (seconds_to_min, speed_converter,
+                                         time_to_seconds)
 from AloneMusic.utils.inline.play import stream_markup
 from AloneMusic.utils.stream.autoclear import auto_clean
+from AloneMusic.utils.stream.lazy import resolve_head
+from AloneMusic.utils.stream.position import positions
+from AloneMusic.utils.stream.speed import tempo_params, variants
+from AloneMusic.utils.stream.urls import stream_urls
 from AloneMusic.utils.thumbnails import get_thumb
 from strings import get_string
 
-autoend = {}
-counter = {}
+# (kind, seconds) from the previous track ending to the next one playing
+transition_gaps = deque(maxlen=100)
+
+# seconds a growing file may stall before ffmpeg gives up on it
+FOLLOW_TIMEOUT = 15
 
 
 def dynamic_media_stream(
-    path: str, video: bool = False, ffmpeg_params: str = None
+    path: str, video: bool = False, ffmpeg_params: str = None, duration: int = None
 ) -> MediaStream:
+    growing = downloader.progress(path)
+    if growing and not os.path.exists(path):
+        # still downloading, so ffmpeg follows the part file as it grows and
+        # stops at the track duration instead of waiting on a finished file
+        follow = f"-follow 1 -rw_timeout {FOLLOW_TIMEOUT * 1000000}"
+        if duration and not ffmpeg_params:
+            follow += f" -to {duration}"
+        path = growing.part
+        ffmpeg_params = f"{follow} {ffmpeg_params}" if ffmpeg_params else follow
     return MediaStream(
         audio_path=path,
         media_path=path,
@@ -57,9 +83,11 @@ def dynamic_media_stream(
 
 async def _clear_(chat_id: int) -> None:
     popped = db.pop(chat_id, None)
-    if popped:
-        await auto_clean(popped)
+    for entry in popped or []:
+        await auto_clean(entry)
     db[chat_id] = []
+    positions.stop(chat_id)
+    auto_end.forget(chat_id)
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
     await set_loop(chat_id, 0)
@@ -67,75 +95,33 @@ async def _clear_(chat_id: int) -> None:
 
 class Call:
     def __init__(self):
-        self.userbot1 = (
-            Client(
-                "AloneMusic1",
-                config.API_ID,
-                config.API_HASH,
-                session_string=config.STRING1,
-            )
-            if config.STRING1
-            else None
-        )
-        self.one = PyTgCalls(self.userbot1) if self.userbot1 else None
-
-        self.userbot2 = (
-            Client(
-                "AloneMusic2",
-                config.API_ID,
-                config.API_HASH,
-                session_string=config.STRING2,
-            )
-            if config.STRING2
-            else None
-        )
-        self.two = PyTgCalls(self.userbot2) if self.userbot2 else None
-
-        self.userbot3 = (
-            Client(
-                "AloneMusic3",
-                config.API_ID,
-                config.API_HASH,
-                session_string=config.STRING3,
-            )
-            if config.STRING3
-            else None
-        )
-        self.three = PyTgCalls(self.userbot3) if self.userbot3 else None
-
-        self.userbot4 = (
-            Client(
-                "AloneMusic4",
-                config.API_ID,
-                config.API_HASH,
-                session_string=config.STRING4,
-            )
-            if config.STRING4
-            else None
-        )
-        self.four = PyTgCalls(self.userbot4) if self.userbot4 else None
-
-        self.userbot5 = (
-            Client(
-                "AloneMusic5",
+        # assistant number -> its own client and the PyTgCalls bound to it
+        self.userbots: dict[int, Client] = {
+            number: Client(
+                f"AloneMusic{number}",
                 config.API_ID,
                 config.API_HASH,
-                session_string=config.STRING5,
+                session_string=session,
             )
-            if config.STRING5
-            else None
-        )
-        self.five = PyTgCalls(self.userbot5) if self.userbot5 else None
+            for number, session in session_strings().items()
+        }
+        self.calls: dict[int, PyTgCalls] = {
+            number: PyTgCalls(client) for number, client in self.userbots.items()
+        }
 
         self.active_calls: set[int] = set()
+        # now playing messages still being sent
+        self._announcements: set[asyncio.Task] = set()
 
     async def pause_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.pause(chat_id)
+        positions.pause(chat_id)
 
     async def resume_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.resume(chat_id)
+        positions.resume(chat_id)
 
     async def mute_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
@@ -162,7 +148,7 @@ class Call:
         try:
             check = db.get(chat_id)
             if check:
-                check.pop(0)
+                await auto_clean(check.pop(0))
         except (IndexError, KeyError):
             pass
         await remove_active_video_chat(chat_id)
@@ -177,32 +163,118 @@ class Call:
         finally:
             self.active_calls.discard(chat_id)
 
-    async def skip_stream(
-        self,
-        chat_id: int,
-        link: str,
-        video: Union[bool, str] = None,
-        image: Union[bool, str] = None,
-    ) -> None:
-        assistant = await group_assistant(self, chat_id)
-        stream = dynamic_media_stream(path=link, video=bool(video))
-        await assistant.play(chat_id, stream)
-
     async def vc_users(self, chat_id: int) -> list:
         assistant = await group_assistant(self, chat_id)
         participants = await assistant.get_participants(chat_id)
         return [p.user_id for p in participants if not p.is_muted]
 
     async def seek_stream(
-        self, chat_id: int, file_path: str, to_seek: str, duration: str, mode: str
+        self,
+        chat_id: int,
+        file_path: str,
+        to_seek: str,
+        duration: str,
+        mode: str,
+        speed: float = 1.0,
     ) -> None:
+        """
+        Restart ``file_path`` at ``to_seek``. Both times are on the listener's
+        timeline, so a track sped up on the fly (``speed`` other than 1.0,
+        with no rendered variant) is seeked in the source and tempo-filtered.
+        """
         assistant = await group_assistant(self, chat_id)
-        ffmpeg_params = f"-ss {to_seek} -to {duration}"
+        growing = downloader.progress(file_path)
+        if growing and growing.size:
+            # seeking past what is on disk: wait for the download to get there
+            ratio = time_to_seconds(to_seek) / max(time_to_seconds(duration), 1)
+            await downloader.wait_for(
+                file_path, int(growing.size * ratio) + PROGRESSIVE_PREBUFFER
+            )
+        if speed != 1.0:
+            ffmpeg_params = tempo_params(
+                speed,
+                time_to_seconds(to_seek) * speed,
+                time_to_seconds(duration) * speed,
+            )
+        else:
+            ffmpeg_params = f"-ss {to_seek} -to {duration}"
         is_video = mode == "video"
         stream = dynamic_media_stream(
             path=file_path, video=is_video, ffmpeg_params=ffmpeg_params
         )
-        await assistant.play(chat_id, stream)
+        try:
+            await assistant.play(chat_id, stream)
+        except Exception:
+            stream_urls.invalidate_url(file_path)
+            raise
+
+    @staticmethod
+    async def _join_chat(chat_id: int, client: Client) -> None:
+        try:
+            await app.get_chat_member(chat_id, client.id)
+            return
+        except UserNotParticipant:
+            pass
+        chat = await app.get_chat(chat_id)
+        invitelink = chat.username or await app.export_chat_invite_link(chat_id)
+        if invitelink.startswith("https://t.me/+"):
+            invitelink = invitelink.replace("https://t.me/+", "https://t.me/joinchat/")
+        try:
+            await client.join_chat(invitelink)
+        except InviteRequestSent:
+            await app.approve_chat_join_request(chat_id, client.id)
+        except UserAlreadyParticipant:
+            pass
+
+    async def migrate(self, chat_id: int, old: int) -> bool:
+        """
+        Move a running call off assistant ``old``: another one joins the chat
+        and resumes the current track from its played position.
+        """
+        check = db.get(chat_id)
+        if not check:
+            return False
+        number = placement.pick(chat_id, exclude=(old,))
+        if number is None:
+            return False
+        await self._join_chat(chat_id, userbot.get(number))
+        assistantdict[chat_id] = number
+        await set_assistant_new(chat_id, number)
+
+        playing = check[0]
+        file_path = playing.get("speed_path") or playing["file"]
+        speed = 1.0 if playing.get("speed_path") else playing.get("speed") or 1.0
+        is_video = str(playing["streamtype"]) == "video"
+        if file_path.startswith("live_"):
+            n, link = await YouTube.video(playing["vidid"], True)
+            if n == 0:
+                raise AssistantErr(link)
+            await self.calls[number].play(
+                chat_id, dynamic_media_stream(path=link, video=is_video)
+            )
+            positions.start(chat_id)
+        else:
+            if file_path.startswith("vid_"):
+                file_path, _ = await YouTube.download(
+                    playing["vidid"], None, videoid=True, video=is_video or None
+                )
+            elif file_path.startswith("index_"):
+                file_path = playing["vidid"]
+            played = max(positions.played(chat_id), 1)
+            await self.seek_stream(
+                chat_id,
+                file_path,
+                seconds_to_min(played),
+                playing["dur"],
+                playing["streamtype"],
+                speed,
+            )
+            positions.seek(chat_id, played)
+        try:
+            await self.calls[old].leave_call(chat_id)
+        except Exception:
+            pass
+        return True
 
     async def speedup_stream(
         self, chat_id: int, file_path: str, speed: float, playing: list
@@ -215,44 +287,44 @@ class Call:
             raise AssistantErr("Invalid stream info for speedup.")
 
         assistant = await group_assistant(self, chat_id)
-        base = os.path.basename(file_path)
-        chatdir = os.path.join("playback", str(speed))
-        os.makedirs(chatdir, exist_ok=True)
-        out = os.path.join(chatdir, base)
-
-        if not os.path.exists(out):
-            vs = str(2.0 / float(speed))
-            cmd = f"ffmpeg -i {file_path} -filter:v setpts={vs}*PTS -filter:a atempo={speed} {out}"
-            proc = await asyncio.create_subprocess_shell(
-                cmd, stdin=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        speed = float(speed)
+        entry = playing[0]
+        # played and dur are on the listener's timeline, get the source one
+        source_seconds = int(entry.get("old_second") or entry["seconds"])
+        position = positions.played(chat_id) * float(entry.get("speed") or 1.0)
+        is_video = str(entry["streamtype"]) == "video"
+
+        out = None
+        if is_video and speed != 1.0:
+            # video frames have to be retimed too, that needs a rendered file
+            await downloader.wait_for(file_path)
+            out = await variants.render(file_path, speed)
+            start, end = position / speed, source_seconds / speed
+            stream = dynamic_media_stream(
+                path=out, video=True, ffmpeg_params=tempo_params(1.0, start, end)
+            )
+        else:
+            stream = dynamic_media_stream(
+                path=file_path,
+                video=is_video,
+                ffmpeg_params=tempo_params(speed, position, source_seconds),
             )
-            await proc.communicate()
-
-        dur = int(
-            await asyncio.get_event_loop().run_in_executor(None, check_duration, out)
-        )
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration_min = seconds_to_min(dur)
-        is_video = playing[0]["streamtype"] == "video"
-        ffmpeg_params = f"-ss {played} -to {duration_min}"
-        stream = dynamic_media_stream(
-            path=out, video=is_video, ffmpeg_params=ffmpeg_params
-        )
 
         if chat_id in db and db[chat_id] and db[chat_id][0].get("file") == file_path:
             await assistant.play(chat_id, stream)
         else:
             raise AssistantErr("Stream mismatch during speedup.")
 
+        duration_min, seconds = speed_converter(source_seconds, speed)
+        positions.seek(chat_id, speed_converter(position, speed)[1])
         db[chat_id][0].update(
             {
-                "played": con_seconds,
                 "dur": duration_min,
-                "seconds": dur,
+                "seconds": seconds,
                 "speed_path": out,
                 "speed": speed,
-                "old_dur": db[chat_id][0].get("dur"),
-                "old_second": db[chat_id][0].get("seconds"),
+                "old_dur": entry.get("old_dur") or entry.get("dur"),
+                "old_second": source_seconds,
             }
         )
 
@@ -274,11 +346,12 @@ class Call:
         link: str,
         video: Union[bool, str] = None,
         image: Union[bool, str] = None,
+        duration: int = None,
     ) -> None:
         assistant = await group_assistant(self, chat_id)
         lang = await get_lang(chat_id)
         _ = get_string(lang)
-        stream = dynamic_media_stream(path=link, video=bool(video))
+        stream = dynamic_media_stream(path=link, video=bool(video), duration=duration)
 
         try:
             await assistant.play(chat_id, stream)
@@ -286,257 +359,212 @@ class Call:
             raise AssistantErr(_["call_8"])
         except TelegramServerError:
             raise AssistantErr(_["call_10"])
+        except FloodWait as e:
+            placement.penalize_chat(chat_id, e.value)
+            raise AssistantErr(f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}")
         except Exception as e:
+            stream_urls.invalidate_url(link)
             raise AssistantErr(f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}")
         self.active_calls.add(chat_id)
         await add_active_chat(chat_id)
         await music_on(chat_id)
+        positions.start(chat_id)
         if video:
             await add_active_video_chat(chat_id)
 
-        if await is_autoend():
-            counter[chat_id] = {}
-            users = len(await assistant.get_participants(chat_id))
-            if users == 1:
-                autoend[chat_id] = datetime.now() + timedelta(minutes=1)
+        await auto_end.watch(chat_id)
 
-    async def play(self, client, chat_id: int) -> None:
+    async def end_idle(self, chat_id: int, verify: bool) -> bool:
+        """Ends a call nobody listens to, see ``AutoEnd``."""
+        if chat_id not in self.active_calls:
+            auto_end.forget(chat_id)
+            return False
+        if verify:
+            assistant = await group_assistant(self, chat_id)
+            participants = await assistant.get_participants(chat_id)
+            if auto_end.seed(chat_id, [p.user_id for p in participants]):
+                return False
+        await mailboxes.run(chat_id, lambda: self.stop_stream(chat_id), kind=STOP)
+        try:
+            await app.send_message(
+                chat_id,
+                "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
+            )
+        except Exception:
+            pass
+        return True
+
+    async def play(self, chat_id: int) -> None:
+        """Moves on from the track that just ended, unless a skip already did."""
+        started = time.monotonic()
+        await mailboxes.run(
+            chat_id,
+            lambda: self._next(chat_id, None, started),
+            kind=ADVANCE,
+            target=mailboxes.head(chat_id),
+        )
+
+    async def skip(self, chat_id: int, count: int = 1) -> Union[str, None]:
+        """
+        Skips ``count`` tracks in the chat's mailbox. Returns "playing",
+        "failed" when the next track could not start, "ended" when the queue
+        ran out, or None when another transition already left the track.
+        """
+        started = time.monotonic()
+        return await mailboxes.run(
+            chat_id,
+            lambda: self._next(chat_id, count, started),
+            kind=ADVANCE,
+            target=mailboxes.head(chat_id),
+        )
+
+    async def replay(self, chat_id: int) -> str:
+        started = time.monotonic()
+        return await mailboxes.run(chat_id, lambda: self._next(chat_id, 0, started))
+
+    async def _next(self, chat_id: int, count: Union[int, None], started: float) -> str:
+        # count None is a track ending by itself, which the loop setting replays
         check = db.get(chat_id)
-        popped = None
-        loop = await get_loop(chat_id)
         try:
-            if loop == 0:
-                popped = check.pop(0)
-            else:
-                loop = loop - 1
-                await set_loop(chat_id, loop)
-            await auto_clean(popped)
-            if not check:
-                await _clear_(chat_id)
-                if chat_id in self.active_calls:
-                    try:
-                        await client.leave_call(chat_id)
-                    except NoActiveGroupCall:
-                        pass
-                    except Exception:
-                        pass
-                    finally:
-                        self.active_calls.discard(chat_id)
-                return
-        except:
+            if count is None:
+                loop = await get_loop(chat_id)
+                count = 1 if loop == 0 else 0
+                if loop:
+                    await set_loop(chat_id, loop - 1)
+            for _ in range(count):
+                await auto_clean(check.pop(0))
+            # a lazy playlist entry that cannot be played is dropped here
+            await resolve_head(chat_id)
+        except Exception:
+            check = None
+        if not check:
             try:
-                await _clear_(chat_id)
-                return await client.leave_call(chat_id)
-            except:
-                return
-        else:
-            queued = check[0]["file"]
-            language = await get_lang(chat_id)
-            _ = get_string(language)
-            title = (check[0]["title"]).title()
-            user = check[0]["by"]
-            original_chat_id = check[0]["chat_id"]
-            streamtype = check[0]["streamtype"]
-            videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
-
-            video = True if str(streamtype) == "video" else False
-
+                await self.stop_stream(chat_id)
+            except Exception:
+                pass
+            return "ended"
+
+        client = await group_assistant(self, chat_id)
+        entry = check[0]
+        queued = entry["file"]
+        videoid = entry["vidid"]
+
+        exis = entry.get("old_dur")
+        if exis:
+            entry["dur"] = exis
+            entry["seconds"] = entry["old_second"]
+            entry["speed_path"] = None
+            entry["speed"] = 1.0
+
+        video = True if str(entry["streamtype"]) == "video" else False
+        # nothing but getting the media ready may run before client.play,
+        # the announcement follows in its own task
+        path = None
+        try:
             if "live_" in queued:
+                kind, duration = "live", None
                 n, link = await YouTube.video(videoid, True)
                 if n == 0:
-                    return await app.send_message(original_chat_id, text=_["call_6"])
-
-                stream = dynamic_media_stream(path=link, video=video)
-                try:
-                    await client.play(chat_id, stream)
-                except Exception:
-                    return await app.send_message(original_chat_id, text=_["call_6"])
-
-                img = await get_thumb(videoid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
-                    photo=img,
-                    has_spoiler=True,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{videoid}",
-                        title[:23],
-                        check[0]["dur"],
-                        user,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-
+                    raise AssistantErr(link)
+                path = link
             elif "vid_" in queued:
-                mystic = await app.send_message(original_chat_id, _["call_7"])
-                try:
-                    file_path, direct = await YouTube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=True if str(streamtype) == "video" else False,
-                    )
-                except:
-                    return await mystic.edit_text(
-                        _["call_6"], disable_web_page_preview=True
-                    )
-
-                stream = dynamic_media_stream(path=file_path, video=video)
-                try:
-                    await client.play(chat_id, stream)
-                except:
-                    return await app.send_message(original_chat_id, text=_["call_6"])
-
-                img = await get_thumb(videoid)
-                button = stream_markup(_, chat_id)
-                await mystic.delete()
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
-                    photo=img,
-                    has_spoiler=True,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{videoid}",
-                        title[:23],
-                        check[0]["dur"],
-                        user,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
+                kind, duration = "youtube", time_to_seconds(entry["dur"])
+                path, direct = await YouTube.download(
+                    videoid, None, videoid=True, video=video, progressive=True
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
-
             elif "index_" in queued:
-                stream = dynamic_media_stream(path=videoid, video=video)
-                try:
-                    await client.play(chat_id, stream)
-                except:
-                    return await app.send_message(original_chat_id, text=_["call_6"])
-
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    chat_id=original_chat_id,
-                    photo=config.STREAM_IMG_URL,
-                    has_spoiler=True,
-                    caption=_["stream_2"].format(user),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-
+                kind, path, duration = "index", videoid, None
             else:
-                stream = dynamic_media_stream(path=queued, video=video)
-                try:
-                    await client.play(chat_id, stream)
-                except:
-                    return await app.send_message(original_chat_id, text=_["call_6"])
-
-                if videoid == "telegram":
-                    button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
-                        photo=(
-                            config.TELEGRAM_AUDIO_URL
-                            if str(streamtype) == "audio"
-                            else config.TELEGRAM_VIDEO_URL
-                        ),
-                        caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
-                        ),
-                        reply_markup=InlineKeyboardMarkup(button),
-                    )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
-
-                elif videoid == "soundcloud":
-                    button = stream_markup(_, chat_id)
-                    run = await app.send_photo(
-                        chat_id=original_chat_id,
-                        photo=config.SOUNCLOUD_IMG_URL,
-                        has_spoiler=True,
-                        caption=_["stream_1"].format(
-                            config.SUPPORT_CHAT, title[:23], check[0]["dur"], user
-                        ),
-                        reply_markup=InlineKeyboardMarkup(button),
-                    )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
-
-                else:
-                    img = await get_thumb(videoid)
-                    button = stream_markup(_, chat_id)
-                    try:
-                        run = await app.send_photo(
-                            chat_id=original_chat_id,
-                            photo=img,
-                            has_spoiler=True,
-                            caption=_["stream_1"].format(
-                                f"https://t.me/{app.username}?start=info_{videoid}",
-                                title[:23],
-                                check[0]["dur"],
-                                user,
-                            ),
-                            reply_markup=InlineKeyboardMarkup(button),
-                        )
-                    except FloodWait as e:
-                        LOGGER(__name__).warning(f"FloodWait: Sleeping for {e.value}")
-                        await asyncio.sleep(e.value)
-                        run = await app.send_photo(
-                            chat_id=original_chat_id,
-                            photo=img,
-                            has_spoiler=True,
-                            caption=_["stream_1"].format(
-                                f"https://t.me/{app.username}?start=info_{videoid}",
-                                title[:23],
-                                check[0]["dur"],
-                                user,
-                            ),
-                            reply_markup=InlineKeyboardMarkup(button),
-                        )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
+                kind, path = "file", queued
+                duration = time_to_seconds(entry["dur"])
+            stream = dynamic_media_stream(path=path, video=video, duration=duration)
+            await client.play(chat_id, stream)
+        except Exception as e:
+            if path:
+                stream_urls.invalidate_url(path)
+            LOGGER(__name__).warning(f"Next track failed in {chat_id}: {e}")
+            self._detach(self._announce_failure(chat_id, entry))
+            return "failed"
+        positions.start(chat_id)
+        elapsed = time.monotonic() - started
+        transition_gaps.append((kind, elapsed))
+        LOGGER(__name__).info(f"Transition to {kind} in {chat_id} took {elapsed:.2f}s")
+        self._detach(self._announce(chat_id, entry, queued))
+        return "playing"
+
+    def _detach(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._announcements.add(task)
+        task.add_done_callback(self._announced)
+
+    def _announced(self, task: asyncio.Task) -> None:
+        self._announcements.discard(task)
+        if not task.cancelled() and task.exception():
+            LOGGER(__name__).warning(f"Now playing message failed: {task.exception()}")
+
+    @staticmethod
+    async def _announce_failure(chat_id: int, entry: dict) -> None:
+        _ = get_string(await get_lang(chat_id))
+        await app.send_message(entry["chat_id"], text=_["call_6"])
+
+    @staticmethod
+    async def _announce(chat_id: int, entry: dict, queued: str) -> None:
+        """Sends the now playing message for ``entry`` once it is already audible."""
+        _ = get_string(await get_lang(chat_id))
+        videoid = entry["vidid"]
+        title = entry["title"].title()[:23]
+        user = entry["by"]
+        info = f"https://t.me/{app.username}?start=info_{videoid}"
+        spoiler, markup = True, "tg"
+        if "index_" in queued:
+            photo = config.STREAM_IMG_URL
+            caption = _["stream_2"].format(user)
+        elif "live_" not in queued and videoid == "telegram":
+            photo = (
+                config.TELEGRAM_AUDIO_URL
+                if str(entry["streamtype"]) == "audio"
+                else config.TELEGRAM_VIDEO_URL
+            )
+            caption = _["stream_1"].format(
+                config.SUPPORT_CHAT, title, entry["dur"], user
+            )
+            spoiler = None
+        elif "live_" not in queued and videoid == "soundcloud":
+            photo = config.SOUNCLOUD_IMG_URL
+            caption = _["stream_1"].format(
+                config.SUPPORT_CHAT, title, entry["dur"], user
+            )
+        else:
+            photo = await get_thumb(videoid)
+            caption = _["stream_1"].format(info, title, entry["dur"], user)
+            if "live_" not in queued:
+                markup = "stream"
+        kwargs = dict(
+            chat_id=entry["chat_id"],
+            photo=photo,
+            has_spoiler=spoiler,
+            caption=caption,
+            reply_markup=InlineKeyboardMarkup(stream_markup(_, chat_id)),
+        )
+        try:
+            run = await app.send_photo(**kwargs)
+        except FloodWait as e:
+            LOGGER(__name__).warning(f"FloodWait: Sleeping for {e.value}")
+            await asyncio.sleep(e.value)
+            run = await app.send_photo(**kwargs)
+        entry["mystic"] = run
+        entry["markup"] = markup
 
     async def start(self) -> None:
         LOGGER(__name__).info("Starting PyTgCalls Clients...")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+        for call in self.calls.values():
+            await call.start()
 
     async def ping(self) -> str:
-        pings = []
-        if config.STRING1:
-            pings.append(self.one.ping)
-        if config.STRING2:
-            pings.append(self.two.ping)
-        if config.STRING3:
-            pings.append(self.three.ping)
-        if config.STRING4:
-            pings.append(self.four.ping)
-        if config.STRING5:
-            pings.append(self.five.ping)
+        pings = [call.ping for call in self.calls.values()]
         return str(round(sum(pings) / len(pings), 3)) if pings else "0.0"
 
     async def decorators(self) -> None:
-        assistants = list(
-            filter(None, [self.one, self.two, self.three, self.four, self.five])
-        )
-
         CRITICAL = (
             ChatUpdate.Status.KICKED
             | ChatUpdate.Status.LEFT_GROUP
@@ -550,13 +578,23 @@ class Call:
                 if isinstance(update, ChatUpdate):
                     status = update.status
                     if (status & ChatUpdate.Status.LEFT_CALL) or (status & CRITICAL):
-                        await self.stop_stream(update.chat_id)
+                        await mailboxes.run(
+                            update.chat_id,
+                            lambda: self.stop_stream(update.chat_id),
+                            kind=STOP,
+                        )
                         return
 
                 elif isinstance(update, StreamEnded):
                     if update.stream_type == StreamEnded.Type.AUDIO:
-                        assistant = await group_assistant(self, update.chat_id)
-                        await self.play(assistant, update.chat_id)
+                        await self.play(update.chat_id)
+
+                elif isinstance(update, UpdatedGroupCallParticipant):
+                    participant = update.participant
+                    if participant.action == GroupCallParticipant.Action.LEFT:
+                        await auto_end.left(update.chat_id, participant.user_id)
+                    else:
+                        auto_end.joined(update.chat_id, participant.user_id)
 
             except Exception:
                 import sys
@@ -574,8 +612,8 @@ class Call:
                 filename = f"update_error_{getattr(update, 'chat_id', 'unknown')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 await send_large_error(full_trace, caption, filename)
 
-        for assistant in assistants:
-            assistant.on_update()(unified_update_handler)
+        for call in self.calls.values():
+            call.on_update()(unified_update_handler)
 
 
 Alone = Call()
@@ -0,0 +1,204 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import os
+import time
+from collections import deque
+from typing import Union
+
+from ..logger import LOGGER
+
+COOKIE_DIR = os.path.join(os.getcwd(), "cookies")
+# how often the folder is checked for added, removed or replaced files
+COOKIE_RESCAN = 10
+# uses allowed per cookie in any 60 second window
+COOKIE_RATE = 20
+# consecutive failures before a cookie is benched, and for how long
+COOKIE_FAILURES = 2
+QUARANTINE_BASE = 60
+QUARANTINE_MAX = 60 * 60
+
+# yt-dlp errors that mean the cookie, not the video, is the problem
+COOKIE_ERRORS = (
+    "sign in to confirm",
+    "http error 429",
+    "http error 403",
+    "login required",
+    "not a bot",
+)
+
+
+class Cookie:
+    __slots__ = (
+        "path",
+        "mtime",
+        "successes",
+        "failures",
+        "streak",
+        "latency",
+        "quarantined_until",
+        "uses",
+        "last_used",
+        "last_error",
+    )
+
+    def __init__(self, path: str, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        self.successes = 0
+        self.failures = 0
+        self.streak = 0
+        self.latency = 0.0
+        self.quarantined_until = 0.0
+        self.uses = deque()
+        self.last_used = 0.0
+        self.last_error = None
+
+    def recent_uses(self, now: float) -> int:
+        while self.uses and self.uses[0] < now - 60:
+            self.uses.popleft()
+        return len(self.uses)
+
+    @property
+    def score(self) -> float:
+        total = self.successes + self.failures
+        return (self.successes + 1) / (total + 2)
+
+
+class CookiePool:
+    """
+    Health-scored pool of the cookie files under ``cookies/``.
+
+    The folder is listed once and then re-checked every ``COOKIE_RESCAN``
+    seconds. Each use is reported back with its outcome and latency. A cookie
+    that fails ``COOKIE_FAILURES`` times in a row is quarantined, for
+    exponentially longer each time, and a cookie is not handed out more than
+    ``COOKIE_RATE`` times a minute while any other one is under its limit.
+    """
+
+    def __init__(self, folder: str = COOKIE_DIR):
+        self.folder = folder
+        self.cookies: dict[str, Cookie] = {}
+        self._dir_mtime = None
+        self._checked = 0.0
+
+    def _scan(self) -> None:
+        try:
+            names = [f for f in os.listdir(self.folder) if f.endswith(".txt")]
+        except OSError:
+            self.cookies.clear()
+            return
+        found = {}
+        for name in names:
+            path = os.path.join(self.folder, name)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            cookie = self.cookies.get(path)
+            if cookie is None or cookie.mtime != mtime:
+                # a new or replaced file starts with a clean record
+                cookie = Cookie(path, mtime)
+            found[path] = cookie
+        if set(found) != set(self.cookies):
+            LOGGER(__name__).info(f"Cookie Pool Loaded: {len(found)} files.")
+        self.cookies = found
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._dir_mtime is not None and now - self._checked < COOKIE_RESCAN:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.folder).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self._dir_mtime or any(
+            self._changed(c) for c in self.cookies.values()
+        ):
+            self._dir_mtime = mtime
+            self._scan()
+
+    @staticmethod
+    def _changed(cookie: Cookie) -> bool:
+        try:
+            return os.path.getmtime(cookie.path) != cookie.mtime
+        except OSError:
+            return True
+
+    def pick(self) -> Union[str, None]:
+        self._refresh()
+        if not self.cookies:
+            return None
+        now = time.monotonic()
+        healthy = [c for c in self.cookies.values() if c.quarantined_until <= now]
+        if not healthy:
+            # everything is benched, use the one closest to parole
+            cookie = min(self.cookies.values(), key=lambda c: c.quarantined_until)
+        else:
+            free = [c for c in healthy if c.recent_uses(now) < COOKIE_RATE]
+            candidates = free or healthy
+            # best record first, then whichever has rested longest
+            cookie = max(candidates, key=lambda c: (round(c.score, 1), -c.last_used))
+        cookie.uses.append(now)
+        cookie.last_used = now
+        return cookie.path
+
+    def report(
+        self, path: str, ok: bool, latency: float = 0.0, error: str = None
+    ) -> None:
+        cookie = self.cookies.get(path)
+        if cookie is None:
+            return
+        if ok:
+            cookie.successes += 1
+            cookie.streak = 0
+            cookie.quarantined_until = 0.0
+            cookie.latency = (
+                latency if not cookie.latency else cookie.latency * 0.8 + latency * 0.2
+            )
+            return
+        cookie.failures += 1
+        cookie.streak += 1
+        cookie.last_error = error
+        if cookie.streak >= COOKIE_FAILURES:
+            backoff = min(
+                QUARANTINE_BASE * 2 ** (cookie.streak - COOKIE_FAILURES), QUARANTINE_MAX
+            )
+            cookie.quarantined_until = time.monotonic() + backoff
+            LOGGER(__name__).warning(
+                f"Cookie {os.path.basename(path)} quarantined for {backoff}s: {error}"
+            )
+
+    def report_error(self, path: str, error: Exception, latency: float = 0.0) -> None:
+        """
+        Only errors caused by the cookie count against it, the others say
+        nothing about it either way.
+        """
+        message = str(error).lower()
+        if any(marker in message for marker in COOKIE_ERRORS):
+            self.report(path, False, latency, str(error)[:200])
+
+    def stats(self) -> list[dict]:
+        self._refresh()
+        now = time.monotonic()
+        return [
+            {
+                "name": os.path.basename(c.path),
+                "successes": c.successes,
+                "failures": c.failures,
+                "latency": round(c.latency * 1000),
+                "quarantined": max(0, int(c.quarantined_until - now)),
+                "recent": c.recent_uses(now),
+                "error": c.last_error,
+            }
+            for c in sorted(self.cookies.values(), key=lambda c: c.path)
+        ]
+
+
+cookie_pool = CookiePool()
@@ -0,0 +1,343 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import itertools
+import json
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Union
+
+import yt_dlp
+
+import config
+
+from ..logger import LOGGER
+from .cookies import cookie_pool
+
+# lower runs first
+PLAYBACK = 0
+BACKGROUND = 1
+MENU = 2
+
+# YoutubeDL instances each worker keeps warm, one per distinct set of options
+WARM_INSTANCES = 8
+# how long one extraction result is reused by the steps that follow it
+INFO_TTL = 5 * 60
+INFO_CACHE_SIZE = 64
+
+# everything below up to ExtractionService runs inside the pool processes,
+# so only plain data may cross back
+_instances: "OrderedDict[str, yt_dlp.YoutubeDL]" = OrderedDict()
+
+
+def _ydl(opts: dict) -> yt_dlp.YoutubeDL:
+    key = json.dumps(opts, sort_keys=True, default=str)
+    ydl = _instances.get(key)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(opts)
+        _instances[key] = ydl
+        while len(_instances) > WARM_INSTANCES:
+            _instances.popitem(last=False)[1].close()
+    _instances.move_to_end(key)
+    return ydl
+
+
+def _warm() -> bool:
+    # pulls in the extractor registry before the first real request
+    yt_dlp.YoutubeDL({"quiet": True}).close()
+    return True
+
+
+def _extract(url: str, opts: dict, download: bool) -> dict:
+    ydl = _ydl(opts)
+    info = ydl.extract_info(url, download=download)
+    return ydl.sanitize_info(info)
+
+
+def _stream_url(url: str, opts: dict) -> str:
+    # what `yt-dlp -g` prints first
+    info = _ydl(opts).extract_info(url, download=False)
+    return (info.get("requested_formats") or [info])[0]["url"]
+
+
+def _download_info(info: dict, opts: dict) -> dict:
+    # downloads from an earlier extraction, like `yt-dlp --load-info-json`
+    ydl = _ydl(opts)
+    return ydl.sanitize_info(ydl.process_ie_result(info, download=True))
+
+
+def _flat_playlist(url: str, opts: dict) -> list:
+    info = _ydl(opts).extract_info(url, download=False)
+    return [
+        {"id": e["id"], "title": e.get("title"), "duration": e.get("duration")}
+        for e in info.get("entries") or []
+        if e and e.get("id")
+    ]
+
+
+class Job:
+    __slots__ = ("fn", "args", "future", "retried")
+
+    def __init__(self, fn: Callable, args: tuple, future: asyncio.Future):
+        self.fn = fn
+        self.args = args
+        self.future = future
+        self.retried = False
+
+
+class ExtractionService:
+    """
+    Runs yt-dlp in a pool of resident worker processes.
+
+    Workers are started once and keep warm ``YoutubeDL`` instances, so a
+    request costs an IPC round trip instead of a fresh ``yt-dlp`` process.
+    Jobs wait in a priority queue, so playback is served before background
+    and menu lookups, and each waiter has its own timeout. A job cancelled
+    or timed out before it starts never reaches the pool; one already running
+    keeps its slot until yt-dlp returns (``socket_timeout`` bounds that) and
+    its result is dropped. If a worker dies the pool is rebuilt and the job
+    is retried once.
+    """
+
+    def __init__(self, workers: int = config.EXTRACT_WORKERS):
+        self.workers = workers
+        self.pool: Union[ProcessPoolExecutor, None] = None
+        self.queue: Union[asyncio.PriorityQueue, None] = None
+        self._dispatchers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._infos: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._info_tasks: dict[tuple, asyncio.Task] = {}
+        self.info_hits = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # spawned, not forked: the pool starts once the Mongo, Pyrogram and
+        # aiohttp threads run, and forking those can deadlock the workers
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def _ensure(self) -> None:
+        if self.pool is None:
+            self.pool = self._pool()
+            self.queue = asyncio.PriorityQueue()
+            self._dispatchers = [
+                asyncio.create_task(self._dispatch()) for _ in range(self.workers)
+            ]
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        # several dispatchers see the same crash, only the first rebuilds
+        if self.pool is not broken:
+            return
+        self.restarts += 1
+        LOGGER(__name__).warning("yt-dlp worker died, restarting the pool.")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._pool()
+        asyncio.create_task(self.warm())
+
+    async def warm(self) -> None:
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        await asyncio.gather(
+            *(loop.run_in_executor(pool, _warm) for _ in range(self.workers)),
+            return_exceptions=True,
+        )
+
+    async def start(self) -> None:
+        self._ensure()
+        await self.warm()
+        LOGGER(__name__).info(f"Started {self.workers} yt-dlp Workers.")
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, seq, job = await self.queue.get()
+            if job.future.done():
+                continue
+            self.running += 1
+            pool = self.pool
+            cookie = job.args[1].get("cookiefile")
+            started = loop.time()
+            try:
+                info = await loop.run_in_executor(pool, job.fn, *job.args)
+                if cookie:
+                    cookie_pool.report(cookie, True, loop.time() - started)
+            except BrokenProcessPool as e:
+                self._restart(pool)
+                if job.retried:
+                    self.failed += 1
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                else:
+                    job.retried = True
+                    await self.queue.put((priority, seq, job))
+            except Exception as e:
+                self.failed += 1
+                if cookie:
+                    cookie_pool.report_error(cookie, e, loop.time() - started)
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self.completed += 1
+                if not job.future.done():
+                    job.future.set_result(info)
+            finally:
+                self.running -= 1
+
+    async def _submit(self, fn: Callable, args: tuple, priority: int, timeout: float):
+        self._ensure()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((priority, next(self._seq), Job(fn, args, future)))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            target = args[0] if isinstance(args[0], str) else args[0].get("id")
+            LOGGER(__name__).warning(
+                f"yt-dlp job for {target} timed out after {timeout}s"
+            )
+            raise
+        finally:
+            # drops a job that is still queued, or the result of a running one
+            future.cancel()
+
+    @staticmethod
+    def _opts(opts: Union[dict, None], cookie_file: Union[str, None] = None) -> dict:
+        opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "socket_timeout": 20,
+            **(opts or {}),
+        }
+        if cookie_file:
+            opts["cookiefile"] = cookie_file
+        return opts
+
+    async def extract(
+        self,
+        url: str,
+        opts: dict = None,
+        download: bool = False,
+        priority: int = PLAYBACK,
+        timeout: float = config.EXTRACT_TIMEOUT,
+    ) -> dict:
+        return await self._submit(
+            _extract, (url, self._opts(opts), download), priority, timeout
+        )
+
+    async def info(
+        self,
+        url: str,
+        cookie_file: str = None,
+        format: str = None,
+        priority: int = PLAYBACK,
+        timeout: float = config.EXTRACT_TIMEOUT,
+    ) -> dict:
+        """
+        Full info dict, the equivalent of ``yt-dlp -J``. With ``format`` the
+        selection is resolved too, so ``requested_formats`` lists exactly what
+        a download would fetch. Results are kept for ``INFO_TTL`` seconds and
+        concurrent lookups share one extraction.
+        """
+        key = (url, format)
+        entry = self._infos.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.info_hits += 1
+            self._infos.move_to_end(key)
+            return entry[1]
+        task = self._info_tasks.get(key)
+        if task is None:
+            opts = self._opts({"format": format} if format else None, cookie_file)
+            task = asyncio.create_task(
+                self.extract(url, opts, priority=priority, timeout=timeout)
+            )
+            self._info_tasks[key] = task
+            task.add_done_callback(lambda t: self._info_done(key, t))
+        return await asyncio.shield(task)
+
+    def _info_done(self, key: tuple, task: asyncio.Task) -> None:
+        self._info_tasks.pop(key, None)
+        if task.cancelled() or task.exception():
+            return
+        self._infos[key] = (time.monotonic() + INFO_TTL, task.result())
+        self._infos.move_to_end(key)
+        while len(self._infos) > INFO_CACHE_SIZE:
+            self._infos.popitem(last=False)
+
+    async def download_info(
+        self,
+        info: dict,
+        opts: dict,
+        priority: int = PLAYBACK,
+        timeout: float = config.EXTRACT_TIMEOUT,
+    ) -> dict:
+        """Download what an earlier ``info`` call resolved, without extracting again."""
+        return await self._submit(
+            _download_info, (info, self._opts(opts)), priority, timeout
+        )
+
+    async def stream_url(
+        self,
+        url: str,
+        format: str,
+        cookie_file: str = None,
+        priority: int = PLAYBACK,
+        timeout: float = config.EXTRACT_TIMEOUT,
+    ) -> str:
+        """Direct media url, the equivalent of ``yt-dlp -g -f format``."""
+        opts = self._opts({"format": format}, cookie_file)
+        return await self._submit(_stream_url, (url, opts), priority, timeout)
+
+    async def flat_playlist(
+        self,
+        url: str,
+        limit: int,
+        cookie_file: str = None,
+        priority: int = PLAYBACK,
+        timeout: float = config.EXTRACT_TIMEOUT,
+    ) -> list:
+        """
+        Entries with id, title and duration, what ``yt-dlp --flat-playlist``
+        knows without resolving each video.
+        """
+        opts = self._opts(
+            {"extract_flat": "in_playlist", "playlistend": limit, "ignoreerrors": True},
+            cookie_file,
+        )
+        return await self._submit(_flat_playlist, (url, opts), priority, timeout)
+
+    def stop(self) -> None:
+        for task in self._dispatchers:
+            task.cancel()
+        self._dispatchers = []
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "info_hits": self.info_hits,
+        }
+
+
+extractor = ExtractionService()
@@ -0,0 +1,148 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import time
+from typing import Union
+
+from pyrogram.errors import FloodWait, Unauthorized
+
+from AloneMusic.utils.database import active, assistantdict
+
+from ..logger import LOGGER
+from .call import Alone
+from .mailbox import mailboxes
+from .placement import placement
+
+# how often every assistant is checked, and how long one check may take
+HEALTH_INTERVAL = 30
+HEALTH_TIMEOUT = 15
+# failed checks in a row before an assistant's chats are moved off it
+HEALTH_FAILURES = 3
+# a FloodWait at least this long fails the assistant over right away
+FLOOD_FAILOVER = 5 * 60
+
+
+class AssistantMonitor:
+    """
+    Checks every assistant client each ``HEALTH_INTERVAL`` seconds.
+
+    An assistant that is disconnected, logged out or fails ``HEALTH_FAILURES``
+    checks in a row, or is flood-waited for ``FLOOD_FAILOVER`` seconds or
+    more, is marked down: no new chats are placed on it and the chats playing
+    on it are migrated to a healthy one, resuming the current track where it
+    was. Chats whose migration fails are retried on the next round. A down
+    assistant is brought back once a check passes again.
+    """
+
+    def __init__(self):
+        self.failures: dict[int, int] = {}
+        self.checked: dict[int, float] = {}
+        self.last_error: dict[int, str] = {}
+        self.migrated = 0
+        self.migrate_failed = 0
+        self._runner: Union[asyncio.Task, None] = None
+
+    async def check(self, number: int) -> Union[str, None]:
+        """None if the assistant answers, else why it is unhealthy."""
+        client = Alone.userbots.get(number)
+        if client is None or not client.is_connected:
+            return "disconnected"
+        try:
+            await asyncio.wait_for(client.get_me(), HEALTH_TIMEOUT)
+        except Unauthorized as e:
+            # the session was revoked, it will not come back by itself
+            self.failures[number] = HEALTH_FAILURES
+            return type(e).__name__
+        except FloodWait as e:
+            placement.penalize(number, e.value)
+            if e.value >= FLOOD_FAILOVER:
+                self.failures[number] = HEALTH_FAILURES
+            return f"FloodWait {e.value}s"
+        except asyncio.TimeoutError:
+            return "timed out"
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    async def _round(self) -> None:
+        for number in list(Alone.userbots):
+            error = await self.check(number)
+            self.checked[number] = time.monotonic()
+            if error is None:
+                self.failures.pop(number, None)
+                self.last_error.pop(number, None)
+                if number in placement.down:
+                    placement.down.discard(number)
+                    LOGGER(__name__).info(f"Assistant {number} is healthy again.")
+                continue
+            self.last_error[number] = error
+            self.failures[number] = self.failures.get(number, 0) + 1
+            if self.failures[number] < HEALTH_FAILURES:
+                continue
+            if number not in placement.down:
+                placement.down.add(number)
+                LOGGER(__name__).warning(
+                    f"Assistant {number} is unhealthy ({error}), failing over."
+                )
+            await self.evacuate(number)
+
+    async def evacuate(self, number: int) -> None:
+        chats = [c for c in list(active) if assistantdict.get(c) == number]
+        for chat_id in chats:
+            try:
+                moved = await mailboxes.run(
+                    chat_id, lambda c=chat_id: Alone.migrate(c, number)
+                )
+            except Exception as e:
+                moved = False
+                LOGGER(__name__).warning(
+                    f"Migrating {chat_id} off assistant {number} failed: {e}"
+                )
+            if moved:
+                self.migrated += 1
+            else:
+                self.migrate_failed += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            try:
+                await self._round()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Assistant health check failed: {e}")
+
+    def start(self) -> None:
+        if self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            LOGGER(__name__).info("Assistant Health Monitor Started.")
+
+    def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "migrated": self.migrated,
+            "migrate_failed": self.migrate_failed,
+            "assistants": {
+                number: {
+                    "failures": self.failures.get(number, 0),
+                    "checked": int(now - self.checked[number])
+                    if number in self.checked
+                    else None,
+                    "error": self.last_error.get(number),
+                }
+                for number in Alone.userbots
+            },
+        }
+
+
+monitor = AssistantMonitor()
@@ -0,0 +1,127 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+from types import SimpleNamespace
+from typing import Union
+
+import aiohttp
+
+from ..logger import LOGGER
+
+POOL_LIMIT = 100
+POOL_LIMIT_PER_HOST = 16
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+# media downloads can take minutes, only a stalled socket should fail them
+STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=10, sock_read=60)
+
+
+class HostStats:
+    __slots__ = ("requests", "errors", "total", "max", "last")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    @property
+    def avg(self) -> float:
+        return self.total / self.requests if self.requests else 0.0
+
+
+class HttpClient:
+    """
+    Process-wide aiohttp session with keep-alive pools and a DNS cache.
+
+    Every outgoing request in ``platforms/`` and ``utils/`` goes through
+    ``http.session`` so connections are reused between calls, and the time to
+    response headers is recorded per host.
+    """
+
+    def __init__(self):
+        self._session: Union[aiohttp.ClientSession, None] = None
+        self.hosts: dict[str, HostStats] = {}
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = asyncio.get_running_loop().time()
+
+        async def on_request_end(session, ctx, params):
+            elapsed = asyncio.get_running_loop().time() - ctx.start
+            stats = self.hosts.setdefault(params.url.host, HostStats())
+            stats.requests += 1
+            stats.total += elapsed
+            stats.last = elapsed
+            stats.max = max(stats.max, elapsed)
+
+        async def on_request_exception(session, ctx, params):
+            stats = self.hosts.setdefault(params.url.host, HostStats())
+            stats.errors += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def _create(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_LIMIT,
+            limit_per_host=POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=DEFAULT_TIMEOUT,
+            trace_configs=[self._trace_config()],
+        )
+
+    def _ensure(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._create()
+        return self._session
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # created lazily as well, so calls made before start() still get a pool
+        return self._ensure()
+
+    async def start(self) -> None:
+        self._ensure()
+        LOGGER(__name__).info("HTTP Client Pool Started.")
+
+    async def stop(self) -> None:
+        if self._session and not self._session.closed:
+            await self._session.close()
+            # give the connector a moment to close SSL transports cleanly
+            await asyncio.sleep(0.25)
+        self._session = None
+        LOGGER(__name__).info("HTTP Client Pool Closed.")
+
+    def stats(self) -> dict[str, SimpleNamespace]:
+        return {
+            host: SimpleNamespace(
+                requests=s.requests,
+                errors=s.errors,
+                avg=round(s.avg * 1000, 1),
+                max=round(s.max * 1000, 1),
+                last=round(s.last * 1000, 1),
+            )
+            for host, s in sorted(
+                self.hosts.items(), key=lambda x: x[1].requests, reverse=True
+            )
+        }
+
+
+http = HttpClient()
@@ -0,0 +1,151 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Union
+
+from AloneMusic.misc import db
+
+from ..logger import LOGGER
+
+# operations that move the queue off its current track, and the one that ends it
+ADVANCE = "advance"
+STOP = "stop"
+
+
+class Operation:
+    __slots__ = ("fn", "kind", "target", "future")
+
+    def __init__(self, fn: Callable[[], Awaitable], kind: str, target: dict):
+        self.fn = fn
+        self.kind = kind
+        self.target = target
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class ChatMailboxes:
+    """
+    Runs the playback operations of each chat one at a time, in the order
+    they were sent.
+
+    A chat with pending operations has one worker task draining its mailbox,
+    which exits once the mailbox is empty. Transitions are collapsed:
+    an ``ADVANCE`` aimed at a track that a queued ``ADVANCE`` already moves
+    away from is answered by that one, a ``STOP`` drops the transitions queued
+    before it, and an ``ADVANCE`` whose track is no longer the head when its
+    turn comes is dropped. Dropped operations resolve to None, so a /skip
+    racing the end of a song skips that song and not the next one too.
+    """
+
+    def __init__(self):
+        self.boxes: dict[int, deque] = {}
+        self.workers: dict[int, asyncio.Task] = {}
+        # the operation each worker is running right now
+        self.running: dict[int, Operation] = {}
+        self.ran = 0
+        self.collapsed = 0
+        self.stale = 0
+
+    def head(self, chat_id: int) -> Union[dict, None]:
+        """
+        The track an ``ADVANCE`` sent now would move away from. While a
+        transition runs that is the track it is replacing, the new head is
+        not playing yet.
+        """
+        op = self.running.get(chat_id)
+        if op and op.kind == ADVANCE and op.target is not None:
+            return op.target
+        queue = db.get(chat_id)
+        return queue[0] if queue else None
+
+    def submit(
+        self,
+        chat_id: int,
+        fn: Callable[[], Awaitable],
+        kind: str = None,
+        target: dict = None,
+    ) -> asyncio.Future:
+        box = self.boxes.setdefault(chat_id, deque())
+        if kind == ADVANCE:
+            for op in box:
+                if op.kind == ADVANCE and op.target is target:
+                    self.collapsed += 1
+                    return op.future
+        elif kind == STOP:
+            for op in [op for op in box if op.kind == ADVANCE]:
+                box.remove(op)
+                op.future.set_result(None)
+                self.collapsed += 1
+        op = Operation(fn, kind, target)
+        box.append(op)
+        if chat_id not in self.workers:
+            self.workers[chat_id] = asyncio.create_task(self._drain(chat_id, box))
+        return op.future
+
+    async def run(
+        self,
+        chat_id: int,
+        fn: Callable[[], Awaitable],
+        kind: str = None,
+        target: dict = None,
+    ):
+        """Queue ``fn`` behind the chat's pending operations and wait for it."""
+        # a caller that gives up does not stop the operation half way
+        return await asyncio.shield(self.submit(chat_id, fn, kind, target))
+
+    async def _drain(self, chat_id: int, box: deque) -> None:
+        op = None
+        try:
+            while box:
+                op = box.popleft()
+                if op.future.done():
+                    continue
+                if op.kind == ADVANCE and op.target is not None:
+                    queue = db.get(chat_id)
+                    if not queue or queue[0] is not op.target:
+                        self.stale += 1
+                        op.future.set_result(None)
+                        continue
+                self.running[chat_id] = op
+                try:
+                    result = await op.fn()
+                except Exception as e:
+                    if not op.future.done():
+                        op.future.set_exception(e)
+                else:
+                    if not op.future.done():
+                        op.future.set_result(result)
+                finally:
+                    self.running.pop(chat_id, None)
+                    self.ran += 1
+        except asyncio.CancelledError:
+            # the one that was running has left the box already
+            if op is not None:
+                op.future.cancel()
+            for op in box:
+                op.future.cancel()
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Mailbox of {chat_id} failed: {e}")
+        finally:
+            self.workers.pop(chat_id, None)
+            if self.boxes.get(chat_id) is box and not box:
+                self.boxes.pop(chat_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "chats": len(self.workers),
+            "queued": sum(len(box) for box in self.boxes.values()),
+            "ran": self.ran,
+            "collapsed": self.collapsed,
+            "stale": self.stale,
+        }
+
+
+mailboxes = ChatMailboxes()
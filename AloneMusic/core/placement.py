@@ -0,0 +1,130 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import time
+from typing import Union
+
+import config
+from AloneMusic.utils.database import active, activevideo, assistantdict
+
+from ..logger import LOGGER
+from .userbot import assistants
+
+# a video call costs about this many audio calls
+VIDEO_CALL_WEIGHT = 3
+# a chat just placed counts against its assistant until it is playing
+PLACEMENT_HOLD = 60
+
+
+class AssistantScheduler:
+    """
+    Places chats on assistants by live load instead of at random.
+
+    Load is counted from the active calls, a video call weighing
+    ``VIDEO_CALL_WEIGHT``, plus chats placed in the last ``PLACEMENT_HOLD``
+    seconds that have not started playing yet. A new chat goes to the least
+    loaded assistant that is below ``config.ASSISTANT_CAPACITY`` and not
+    sitting out a FloodWait; when there is none, to the least loaded of all.
+    Assistants failed over by the health monitor are never picked.
+    """
+
+    def __init__(self, capacity: int = config.ASSISTANT_CAPACITY):
+        self.capacity = capacity
+        self.flood_until: dict[int, float] = {}
+        self.floods: dict[int, int] = {}
+        self.placed: dict[int, int] = {}
+        self._pending: dict[int, tuple] = {}
+        # failed over by the health monitor until it recovers
+        self.down: set[int] = set()
+
+    def loads(self) -> dict[int, dict]:
+        now = time.monotonic()
+        loads = {n: {"calls": 0, "video": 0, "pending": 0} for n in assistants}
+        for chat_id in active:
+            number = assistantdict.get(chat_id)
+            if number in loads:
+                loads[number]["calls"] += 1
+                if chat_id in activevideo:
+                    loads[number]["video"] += 1
+        for chat_id, (number, expires) in list(self._pending.items()):
+            if expires < now or chat_id in active:
+                self._pending.pop(chat_id, None)
+            elif number in loads:
+                loads[number]["pending"] += 1
+        return loads
+
+    @staticmethod
+    def weight(load: dict) -> int:
+        audio = load["calls"] - load["video"]
+        return audio + load["video"] * VIDEO_CALL_WEIGHT + load["pending"]
+
+    def healthy(self, number: int) -> bool:
+        return (
+            number not in self.down
+            and self.flood_until.get(number, 0) <= time.monotonic()
+        )
+
+    def usable(self, chat_id: int, number: int) -> bool:
+        """
+        Whether ``chat_id`` may stay on ``number``. A chat in a call stays on
+        a failed-over assistant until the health monitor migrates it.
+        """
+        if number not in assistants:
+            return False
+        return number not in self.down or chat_id in active
+
+    def pick(self, chat_id: int, exclude: tuple = ()) -> Union[int, None]:
+        loads = self.loads()
+        for number in (*exclude, *self.down):
+            loads.pop(number, None)
+        if not loads:
+            return None
+        ready = [
+            n
+            for n in loads
+            if self.healthy(n) and self.weight(loads[n]) < self.capacity
+        ]
+        number = min(ready or loads, key=lambda n: (self.weight(loads[n]), n))
+        if not ready:
+            LOGGER(__name__).warning(
+                f"Every assistant is full or flood-waited, placing {chat_id} on {number}."
+            )
+        self._pending[chat_id] = (number, time.monotonic() + PLACEMENT_HOLD)
+        self.placed[number] = self.placed.get(number, 0) + 1
+        return number
+
+    def penalize(self, number: Union[int, None], seconds: int) -> None:
+        if number is None:
+            return
+        self.flood_until[number] = max(
+            self.flood_until.get(number, 0), time.monotonic() + seconds
+        )
+        self.floods[number] = self.floods.get(number, 0) + 1
+        LOGGER(__name__).warning(f"Assistant {number} flood-waited for {seconds}s.")
+
+    def penalize_chat(self, chat_id: int, seconds: int) -> None:
+        self.penalize(assistantdict.get(chat_id), seconds)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        loads = self.loads()
+        return [
+            {
+                "number": number,
+                **load,
+                "weight": self.weight(load),
+                "flood": max(0, int(self.flood_until.get(number, 0) - now)),
+                "floods": self.floods.get(number, 0),
+                "placed": self.placed.get(number, 0),
+                "down": number in self.down,
+            }
+            for number, load in sorted(loads.items())
+        ]
+
+
+placement = AssistantScheduler()
@@ -6,6 +6,8 @@
 #
 # All rights reserved.
 
+from typing import Union
+
 from pyrogram import Client
 
 import config
@@ -16,163 +18,58 @@ assistants = []
 assistantids = []
 
 
+def session_strings() -> dict[int, str]:
+    """Assistant number -> session string, for every configured assistant."""
+    return {
+        number: session
+        for number, session in enumerate(config.STRING_SESSIONS, start=1)
+        if session
+    }
+
+
 class Userbot(Client):
     def __init__(self):
-        self.one = Client(
-            name="AloneMusic1",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING1),
-            no_updates=True,
-        )
-        self.two = Client(
-            name="AloneMusic2",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING2),
-            no_updates=True,
-        )
-        self.three = Client(
-            name="AloneMusic3",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING3),
-            no_updates=True,
-        )
-        self.four = Client(
-            name="AloneMusic4",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING4),
-            no_updates=True,
-        )
-        self.five = Client(
-            name="AloneMusic5",
-            api_id=config.API_ID,
-            api_hash=config.API_HASH,
-            session_string=str(config.STRING5),
-            no_updates=True,
-        )
+        self.clients: dict[int, Client] = {
+            number: Client(
+                name=f"AloneMusic{number}",
+                api_id=config.API_ID,
+                api_hash=config.API_HASH,
+                session_string=str(session),
+                no_updates=True,
+            )
+            for number, session in session_strings().items()
+        }
+
+    def get(self, number: int) -> Union[Client, None]:
+        return self.clients.get(int(number))
 
     async def start(self):
         LOGGER(__name__).info("Starting Assistants...")
-        if config.STRING1:
-            await self.one.start()
+        for number, client in self.clients.items():
+            await client.start()
             try:
-                await self.one.join_chat("TheAloneTeam")
-                await self.one.join_chat("Aashikteam")
+                await client.join_chat("TheAloneTeam")
+                await client.join_chat("Aashikteam")
             except:
                 pass
-            assistants.append(1)
+            assistants.append(number)
             try:
-                await self.one.send_message(config.LOGGER_ID, "Assistant Started")
+                await client.send_message(config.LOGGER_ID, "Assistant Started")
             except:
                 LOGGER(__name__).error(
-                    "Assistant Account 1 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
+                    f"Assistant Account {number} has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
                 )
                 exit()
-            self.one.id = self.one.me.id
-            self.one.name = self.one.me.mention
-            self.one.username = self.one.me.username
-            assistantids.append(self.one.id)
-            LOGGER(__name__).info(f"Assistant Started as {self.one.name}")
+            client.id = client.me.id
+            client.name = client.me.mention
+            client.username = client.me.username
+            assistantids.append(client.id)
+            LOGGER(__name__).info(f"Assistant {number} Started as {client.name}")
 
-        if config.STRING2:
-            await self.two.start()
-            try:
-                await self.two.join_chat("Aashikteam")
-                await self.one.join_chat("TheAloneTeam")
-            except:
-                pass
-            assistants.append(2)
-            try:
-                await self.two.send_message(config.LOGGER_ID, "Assistant Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 2 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin!"
-                )
-                exit()
-            self.two.id = self.two.me.id
-            self.two.name = self.two.me.mention
-            self.two.username = self.two.me.username
-            assistantids.append(self.two.id)
-            LOGGER(__name__).info(f"Assistant Two Started as {self.two.name}")
-
-        if config.STRING3:
-            await self.three.start()
-            try:
-                await self.three.join_chat("Aashikteam")
-                await self.one.join_chat("TheAloneTeam")
-            except:
-                pass
-            assistants.append(3)
-            try:
-                await self.three.send_message(config.LOGGER_ID, "Assistant Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 3 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.three.id = self.three.me.id
-            self.three.name = self.three.me.mention
-            self.three.username = self.three.me.username
-            assistantids.append(self.three.id)
-            LOGGER(__name__).info(f"Assistant Three Started as {self.three.name}")
-
-        if config.STRING4:
-            await self.four.start()
-            try:
-                await self.four.join_chat("TheAloneTeam")
-                await self.one.join_chat("Aashikteam")
-            except:
-                pass
-            assistants.append(4)
-            try:
-                await self.four.send_message(config.LOGGER_ID, "Assistant Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 4 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.four.id = self.four.me.id
-            self.four.name = self.four.me.mention
-            self.four.username = self.four.me.username
-            assistantids.append(self.four.id)
-            LOGGER(__name__).info(f"Assistant Four Started as {self.four.name}")
-
-        if config.STRING5:
-            await self.five.start()
+    async def stop(self):
+        LOGGER(__name__).info("Stopping Assistants...")
+        for client in self.clients.values():
             try:
-                await self.five.join_chat("TheAloneTeam")
-                await self.one.join_chat("Aashikteam")
+                await client.stop()
             except:
                 pass
-            assistants.append(5)
-            try:
-                await self.five.send_message(config.LOGGER_ID, "Assistant Started")
-            except:
-                LOGGER(__name__).error(
-                    "Assistant Account 5 has failed to access the log Group. Make sure that you have added your assistant to your log group and promoted as admin! "
-                )
-                exit()
-            self.five.id = self.five.me.id
-            self.five.name = self.five.me.mention
-            self.five.username = self.five.me.username
-            assistantids.append(self.five.id)
-            LOGGER(__name__).info(f"Assistant Five Started as {self.five.name}")
-
-    async def stop(self):
-        LOGGER(__name__).info("Stopping Assistants...")
-        try:
-            if config.STRING1:
-                await self.one.stop()
-            if config.STRING2:
-                await self.two.stop()
-            if config.STRING3:
-                await self.three.stop()
-            if config.STRING4:
-                await self.four.stop()
-            if config.STRING5:
-                await self.five.stop()
-        except:
-            pass
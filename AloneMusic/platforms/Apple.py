@@ -8,9 +8,10 @@
 import re
 from typing import Union
 
-import aiohttp
 from bs4 import BeautifulSoup
-from py_yt import VideosSearch
+
+from AloneMusic.core.http import http
+from AloneMusic.utils.metadata import thumb_url, video_meta
 
 
 class AppleAPI:
@@ -27,11 +28,10 @@ class AppleAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http.session.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         search = None
         for tag in soup.find_all("meta"):
@@ -39,13 +39,12 @@ class AppleAPI:
                 search = tag.get("content", None)
         if search is None:
             return False
-        results = VideosSearch(search, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        result = await video_meta.get(search)
+        title = result["title"]
+        ytlink = result["link"]
+        vidid = result["id"]
+        duration_min = result["duration"]
+        thumbnail = thumb_url(result)
         track_details = {
             "title": title,
             "link": ytlink,
@@ -59,11 +58,10 @@ class AppleAPI:
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http.session.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         applelinks = soup.find_all("meta", attrs={"property": "music:song"})
         results = []
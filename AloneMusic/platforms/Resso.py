@@ -9,9 +9,10 @@
 import re
 from typing import Union
 
-import aiohttp
 from bs4 import BeautifulSoup
-from py_yt import VideosSearch
+
+from AloneMusic.core.http import http
+from AloneMusic.utils.metadata import thumb_url, video_meta
 
 
 class RessoAPI:
@@ -28,11 +29,10 @@ class RessoAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
+        async with http.session.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
         soup = BeautifulSoup(html, "html.parser")
         for tag in soup.find_all("meta"):
             if tag.get("property", None) == "og:title":
@@ -45,13 +45,12 @@ class RessoAPI:
                     pass
         if des == "":
             return
-        results = VideosSearch(title, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        result = await video_meta.get(title)
+        title = result["title"]
+        ytlink = result["link"]
+        vidid = result["id"]
+        duration_min = result["duration"]
+        thumbnail = thumb_url(result)
         track_details = {
             "title": title,
             "link": ytlink,
@@ -8,8 +8,7 @@
 
 from os import path
 
-from yt_dlp import YoutubeDL
-
+from AloneMusic.core.extractor import extractor
 from AloneMusic.utils.formatters import seconds_to_min
 
 
@@ -30,9 +29,8 @@ class SoundAPI:
             return False
 
     async def download(self, url):
-        d = YoutubeDL(self.opts)
         try:
-            info = d.extract_info(url)
+            info = await extractor.extract(url, self.opts, download=True, timeout=300)
         except:
             return False
         xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
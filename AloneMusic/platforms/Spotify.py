@@ -9,10 +9,10 @@
 import re
 
 import spotipy
-from py_yt import VideosSearch
 from spotipy.oauth2 import SpotifyClientCredentials
 
 import config
+from AloneMusic.utils.metadata import thumb_url, video_meta
 
 
 class SpotifyAPI:
@@ -43,13 +43,12 @@ class SpotifyAPI:
             fetched = f' {artist["name"]}'
             if "Various Artists" not in fetched:
                 info += fetched
-        results = VideosSearch(info, limit=1)
-        for result in (await results.next())["result"]:
-            ytlink = result["link"]
-            title = result["title"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        result = await video_meta.get(info)
+        title = result["title"]
+        ytlink = result["link"]
+        vidid = result["id"]
+        duration_min = result["duration"]
+        thumbnail = thumb_url(result)
         track_details = {
             "title": title,
             "link": ytlink,
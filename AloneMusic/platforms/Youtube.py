@@ -8,37 +8,41 @@
 # All rights reserved.
 
 import asyncio
-import json
 import os
-import random
 import re
+import time
 from typing import Union
 from urllib.parse import quote_plus, urlparse
 
 import aiohttp
-import yt_dlp
-from py_yt import VideosSearch
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 
+from AloneMusic.core.backends import backends
+from AloneMusic.core.cookies import cookie_pool
+from AloneMusic.core.extractor import BACKGROUND, MENU, PLAYBACK, extractor
+from AloneMusic.core.http import http
 from AloneMusic.utils.database import is_on_off
-from AloneMusic.utils.formatters import time_to_seconds
+from AloneMusic.utils.downloader import (PROGRESSIVE_PREBUFFER, downloader,
+                                         throttle)
+from AloneMusic.utils.formatters import seconds_to_min, time_to_seconds
+from AloneMusic.utils.metadata import search_cache, thumb_url, video_meta
+from AloneMusic.utils.stream.cache import (DOWNLOAD_FOLDER, inflight,
+                                           media_cache)
+from AloneMusic.utils.stream.urls import stream_urls
 
 API_URL = "https://kartik.opusx.workers.dev/yt"
-DOWNLOAD_FOLDER = "downloads"
-CHUNK_SIZE = 8192  # don't chnge this value
 RETRIES = 6  # you may increase if error arises for some yt videos
-
-
-def cookie_txt_file():
-    cookie_dir = f"{os.getcwd()}/cookies"
-    if not os.path.exists(cookie_dir):
-        return None
-    cookies_files = [f for f in os.listdir(cookie_dir) if f.endswith(".txt")]
-    if not cookies_files:
-        return None
-    cookie_file = os.path.join(cookie_dir, random.choice(cookies_files))
-    return cookie_file
+DOWNLOAD_TIMEOUT = 600
+STREAM_FORMAT = "best[height<=?720][width<=?1280]"
+VIDEO_FORMAT = "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])"
+# youtube's own audio tracks, opus in webm first, then aac in m4a; both are
+# saved and played as they are, the api's mp3 transcode is only a fallback
+AUDIO_FORMAT = "bestaudio[acodec=opus]/bestaudio[ext=m4a]"
+AUDIO_EXTS = ("webm", "m4a", "mp3")
+# what yt-dlp can offer in place of the api's mp4, a single file that plays
+# while it downloads
+PROGRESSIVE_FORMAT = "best[ext=mp4][height<=?720][width<=?1280]"
 
 
 async def _fetch_json_aio(
@@ -64,133 +68,256 @@ async def _fetch_json_aio(
 
 
 async def _download_stream_aio(
-    session: aiohttp.ClientSession, url: str, dest_path: str, retries: int = RETRIES
-):
-    backoff = 1
-    for attempt in range(retries):
-        try:
-            async with session.get(url, timeout=None) as resp:
-                if resp.status != 200:
-                    raise Exception(f"status {resp.status}")
-                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                with open(dest_path, "wb") as f:
-                    while True:
-                        chunk = await resp.content.read(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        f.write(chunk)
-                return True
-        except Exception:
-            if attempt < retries - 1:
-                await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 16)
-            else:
-                return False
+    session: aiohttp.ClientSession, url: str, dest_path: str, sequential: bool = False
+) -> bool:
+    return await downloader.fetch(session, url, dest_path, sequential)
+
+
+def _api_format(kind: str) -> str:
+    return "mp4" if kind == "video" else "mp3"
+
+
+def _api_path(video_id: str, kind: str) -> str:
+    return os.path.join(DOWNLOAD_FOLDER, f"{video_id}.{_api_format(kind)}")
+
+
+def _audio_paths(video_id: str) -> list:
+    return [os.path.join(DOWNLOAD_FOLDER, f"{video_id}.{ext}") for ext in AUDIO_EXTS]
+
+
+async def _lookup_api(link: str, kind: str):
+    format_param = _api_format(kind)
+    api_url = f"{API_URL}?url={quote_plus(link)}&type={kind}&format={format_param}"
+    # yt-dlp is hedged in after the api's p95, long retry chains only add load
+    data = await _fetch_json_aio(http.session, api_url, retries=2)
+    if not data or not data.get("success") or not data.get("download_url"):
+        raise LookupError(f"api returned nothing for {link}")
+    return data["download_url"], format_param
+
+
+async def _lookup_ytdlp(link: str, kind: str):
+    cookie_file = cookie_pool.pick()
+    if not cookie_file:
+        return None
+    format = AUDIO_FORMAT if kind == "audio" else PROGRESSIVE_FORMAT
+    priority = BACKGROUND if throttle.get() else PLAYBACK
+    info = await extractor.info(link, cookie_file, format=format, priority=priority)
+    fmt = (info.get("requested_formats") or [info])[0]
+    exts = AUDIO_EXTS[:2] if kind == "audio" else ("mp4",)
+    if not fmt.get("url") or fmt.get("ext") not in exts:
+        return None
+    return fmt["url"], fmt["ext"]
+
+
+async def _acquire(link: str, video_id: str, kind: str):
+    lookups = {
+        "ytdlp": lambda: _lookup_ytdlp(link, kind),
+        "api": lambda: _lookup_api(link, kind),
+    }
+    if kind == "audio":
+        # native audio is played as is, the api's mp3 is only the fallback
+        # when yt-dlp has nothing, not a race against a slow yt-dlp
+        remaining, hedged = ["ytdlp", "api"], False
+    else:
+        # the api's video is ready to play in one file
+        remaining, hedged = backends.rank(("api", "ytdlp")), True
+    # a lookup that lost is picked up again if the winner's download fails
+    running = {}
+    while remaining:
+        won = await backends.hedge(
+            [(name, lookups[name]) for name in remaining], running, hedged
+        )
+        if not won:
+            return None
+        name, (url, ext) = won
+        remaining.remove(name)
+        file_path = os.path.join(DOWNLOAD_FOLDER, f"{video_id}.{ext}")
+        # audio is written front to back so it can be played while downloading
+        ok = await _download_stream_aio(
+            http.session, url, file_path, sequential=kind == "audio"
+        )
+        if ok:
+            return media_cache.add(file_path, video_id, kind)
+        backends.report(name, False)
+    return None
+
+
+def _promote(video_id: str, kind: str) -> None:
+    # a prefetch of this track may be running under the background budget
+    if throttle.get() is not None or f"{video_id}:{kind}" not in inflight:
+        return
+    if kind == "video":
+        return downloader.promote(_api_path(video_id, kind))
+    # until the lookup is done it is not known which codec is coming
+    paths = _audio_paths(video_id)
+    for path in [p for p in paths if downloader.progress(p)] or paths:
+        downloader.promote(path)
 
 
 async def download_song(link: str):
     video_id = link.split("v=")[-1].split("&")[0]
-    for ext in ["mp3", "m4a", "webm"]:
-        file_path = f"{DOWNLOAD_FOLDER}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            return file_path
-    format_param = "mp3"
-    api_url = f"{API_URL}?url={quote_plus(link)}&type=audio&format={format_param}"
-    async with aiohttp.ClientSession() as session:
-        data = await _fetch_json_aio(session, api_url)
-        if not data:
-            return None
-        success = data.get("success", False)
-        if not success:
+    cached = media_cache.lookup(video_id, "audio")
+    if cached:
+        return cached
+    _promote(video_id, "audio")
+    return await inflight.run(
+        f"{video_id}:audio", lambda: _acquire(link, video_id, "audio")
+    )
+
+
+async def stream_song(link: str):
+    """
+    Like download_song, but returns as soon as the first few hundred KB are on
+    disk. The rest keeps downloading in the background and the call follows
+    the growing file.
+    """
+    video_id = link.split("v=")[-1].split("&")[0]
+    cached = media_cache.lookup(video_id, "audio")
+    if cached:
+        return cached
+    task = asyncio.ensure_future(download_song(link))
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    paths = _audio_paths(video_id)
+    while not task.done():
+        growing = [g for g in map(downloader.progress, paths) if g]
+        for g in growing:
+            if g.contiguous >= min(
+                PROGRESSIVE_PREBUFFER, g.size or PROGRESSIVE_PREBUFFER
+            ):
+                return g.dest
+        # woken by more of the file, by its download starting, or by the end
+        waiters = [asyncio.ensure_future(g.progressed()) for g in growing] or [
+            asyncio.ensure_future(downloader.started())
+        ]
+        try:
+            await asyncio.wait([task, *waiters], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+    return task.result()
+
+
+async def _decode_cpu(path: str) -> Union[float, None]:
+    # the same work the call does for every track: decode to 48 kHz stereo pcm
+    proc = await asyncio.create_subprocess_exec(
+        "ffmpeg",
+        "-nostdin",
+        "-benchmark",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-ar",
+        "48000",
+        "-ac",
+        "2",
+        "-y",
+        os.devnull,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, err = await proc.communicate()
+    match = re.search(rb"utime=([\d.]+)s stime=([\d.]+)s", err)
+    return float(match.group(1)) + float(match.group(2)) if match else None
+
+
+async def benchmark_audio(link: str) -> list:
+    """
+    Fetch one track both ways, the native stream and the api's mp3, into a
+    scratch folder and measure bytes, time to a complete file (lookup
+    included) and the cpu ffmpeg spends decoding it.
+    """
+    video_id = link.split("v=")[-1].split("&")[0]
+    folder = os.path.join(DOWNLOAD_FOLDER, ".bench")
+    os.makedirs(folder, exist_ok=True)
+
+    async def native():
+        cookie_file = cookie_pool.pick()
+        if not cookie_file:
             return None
-        download_url = data.get("download_url")
-        if not download_url:
+        info = await extractor.info(link, cookie_file, format=AUDIO_FORMAT)
+        fmt = (info.get("requested_formats") or [info])[0]
+        return fmt["url"], fmt["ext"], fmt.get("acodec")
+
+    async def api():
+        url = f"{API_URL}?url={quote_plus(link)}&type=audio&format=mp3"
+        data = await _fetch_json_aio(http.session, url, retries=1)
+        if not data or not data.get("download_url"):
             return None
-        file_extension = format_param
-        if file_extension == "opus":
-            file_extension = "m4a"
-        file_name = f"{video_id}.{file_extension}"
-        file_path = os.path.join(DOWNLOAD_FOLDER, file_name)
-        ok = await _download_stream_aio(session, download_url, file_path)
-        return file_path if ok else None
+        return data["download_url"], "mp3", "mp3"
+
+    results = []
+    for name, lookup in (("native", native), ("api", api)):
+        started = time.monotonic()
+        result = {"source": name, "codec": None, "size": 0, "seconds": 0, "cpu": None}
+        results.append(result)
+        try:
+            source = await lookup()
+        except Exception:
+            source = None
+        if not source:
+            continue
+        url, ext, result["codec"] = source
+        dest = os.path.join(folder, f"{video_id}.{ext}")
+        try:
+            if not await downloader.fetch(http.session, url, dest):
+                continue
+            result["seconds"] = round(time.monotonic() - started, 2)
+            result["size"] = os.path.getsize(dest)
+            result["cpu"] = await _decode_cpu(dest)
+        finally:
+            if os.path.exists(dest):
+                os.remove(dest)
+    return results
 
 
 async def download_video(link: str):
     video_id = link.split("v=")[-1].split("&")[0]
-    for ext in ["mp4", "webm", "mkv"]:
-        file_path = f"{DOWNLOAD_FOLDER}/{video_id}.{ext}"
-        if os.path.exists(file_path):
-            return file_path
-    format_param = "mp4"
-    api_url = f"{API_URL}?url={quote_plus(link)}&type=video&format={format_param}"
-    async with aiohttp.ClientSession() as session:
-        data = await _fetch_json_aio(session, api_url)
-        if not data:
-            return None
-        success = data.get("success", False)
-        if not success:
-            return None
-        download_url = data.get("download_url")
-        if not download_url:
-            return None
-        file_extension = "mp4"
-        file_name = f"{video_id}.{file_extension}"
-        file_path = os.path.join(DOWNLOAD_FOLDER, file_name)
-        ok = await _download_stream_aio(session, download_url, file_path)
-        return file_path if ok else None
+    cached = media_cache.lookup(video_id, "video")
+    if cached:
+        return cached
+    _promote(video_id, "video")
+    return await inflight.run(
+        f"{video_id}:video", lambda: _acquire(link, video_id, "video")
+    )
+
+
+async def stream_url(link: str, cookie_file: str) -> str:
+    video_id = link.split("v=")[-1].split("&")[0]
+    return await stream_urls.get(
+        video_id,
+        STREAM_FORMAT,
+        lambda: extractor.stream_url(link, STREAM_FORMAT, cookie_file),
+    )
 
 
-async def check_file_size(link):
+async def check_file_size(link, format: str = VIDEO_FORMAT):
     async def get_format_info(link):
-        cookie_file = cookie_txt_file()
+        cookie_file = cookie_pool.pick()
         if not cookie_file:
             return None
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies",
-            cookie_file,
-            "-J",
-            link,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
+        try:
+            return await extractor.info(link, cookie_file, format=format)
+        except Exception:
             return None
-        return json.loads(stdout.decode())
 
     def parse_size(formats):
         total_size = 0
         for format in formats:
-            if "filesize" in format and format["filesize"]:
-                total_size += format["filesize"]
+            size = format.get("filesize") or format.get("filesize_approx")
+            if size:
+                total_size += size
         return total_size
 
     info = await get_format_info(link)
     if info is None:
         return None
-    formats = info.get("formats", [])
-    if not formats:
-        return None
+    # only what the format selector picked, which is what gets downloaded
+    formats = info.get("requested_formats") or [info]
     total_size = parse_size(formats)
     return total_size
 
 
-async def shell_cmd(cmd):
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
-    out, errorz = await proc.communicate()
-    if errorz:
-        if "unavailable videos are hidden" in (errorz.decode("utf-8")).lower():
-            return out.decode("utf-8")
-        else:
-            return errorz.decode("utf-8")
-    return out.decode("utf-8")
-
-
 class YouTubeAPI:
     def __init__(self):
         self.base = "https://www.youtube.com/watch?v="
@@ -233,19 +360,30 @@ class YouTubeAPI:
 
     async def details(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
+            # already described by a flat playlist listing, no search needed
+            flat = video_meta.flat(link)
+            if flat:
+                title, duration_sec = flat
+                thumbnail = f"https://i.ytimg.com/vi/{link}/hqdefault.jpg"
+                return (
+                    title,
+                    seconds_to_min(duration_sec),
+                    duration_sec,
+                    thumbnail,
+                    link,
+                )
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            vidid = result["id"]
-            if str(duration_min) == "None":
-                duration_sec = 0
-            else:
-                duration_sec = int(time_to_seconds(duration_min))
+        result = await video_meta.get(link)
+        title = result["title"]
+        duration_min = result["duration"]
+        thumbnail = thumb_url(result)
+        vidid = result["id"]
+        if str(duration_min) == "None":
+            duration_sec = 0
+        else:
+            duration_sec = int(time_to_seconds(duration_min))
         return title, duration_min, duration_sec, thumbnail, vidid
 
     async def title(self, link: str, videoid: Union[bool, str] = None):
@@ -253,30 +391,24 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-        return title
+        result = await video_meta.get(link)
+        return result["title"]
 
     async def duration(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            duration = result["duration"]
-        return duration
+        result = await video_meta.get(link)
+        return result["duration"]
 
     async def thumbnail(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
+        result = await video_meta.get(link)
+        return thumb_url(result)
 
     async def video(self, link: str, videoid: Union[bool, str] = None):
         if videoid:
@@ -289,25 +421,13 @@ class YouTubeAPI:
                 return 1, downloaded_file
         except Exception as e:
             print(f"Video API failed: {e}")
-        cookie_file = cookie_txt_file()
+        cookie_file = cookie_pool.pick()
         if not cookie_file:
             return 0, "No cookies found. Cannot download video."
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies",
-            cookie_file,
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            f"{link}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
+        try:
+            return 1, await stream_url(link, cookie_file)
+        except Exception as e:
+            return 0, str(e)
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid:
@@ -317,19 +437,18 @@ class YouTubeAPI:
         parsed_link = urlparse(link)
         if parsed_link.hostname == "music.youtube.com":
             link = link.replace("music.youtube.com", "www.youtube.com", 1)
-        cookie_file = cookie_txt_file()
+        cookie_file = cookie_pool.pick()
         if not cookie_file:
             return []
-        playlist = await shell_cmd(
-            f"yt-dlp -i --get-id --flat-playlist --cookies {cookie_file} --playlist-end {limit} --skip-download {link}"
-        )
         try:
-            result = playlist.split("\n")
-            for key in result:
-                if key == "":
-                    result.remove(key)
+            entries = await extractor.flat_playlist(link, limit, cookie_file)
         except:
-            result = []
+            entries = []
+        result = []
+        for entry in entries:
+            if entry["title"] and entry["duration"]:
+                video_meta.put_flat(entry["id"], entry["title"], int(entry["duration"]))
+            result.append(entry["id"])
         return result
 
     async def track(self, link: str, videoid: Union[bool, str] = None):
@@ -337,19 +456,14 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        results = VideosSearch(link, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            duration_min = result["duration"]
-            vidid = result["id"]
-            yturl = result["link"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
+        result = await video_meta.get(link)
+        vidid = result["id"]
         track_details = {
-            "title": title,
-            "link": yturl,
+            "title": result["title"],
+            "link": result["link"],
             "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
+            "duration_min": result["duration"],
+            "thumb": thumb_url(result),
         }
         return track_details, vidid
 
@@ -358,38 +472,36 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        cookie_file = cookie_txt_file()
+        cookie_file = cookie_pool.pick()
         if not cookie_file:
             return [], link
         ytdl_opts = {"quiet": True, "cookiefile": cookie_file}
-        ydl = yt_dlp.YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+        r = await extractor.extract(link, ytdl_opts, priority=MENU)
+        formats_available = []
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except:
+                continue
+            if "dash" not in str(format["format"]).lower():
                 try:
-                    str(format["format"])
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
                 except:
                     continue
-                if "dash" not in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format.get("filesize"),
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format.get("format_note"),
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format.get("filesize"),
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format.get("format_note"),
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
     async def slider(
@@ -402,12 +514,11 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        a = VideosSearch(link, limit=10)
-        result = (await a.next()).get("result")
+        result = await search_cache.page(link)
         title = result[query_type]["title"]
         duration_min = result[query_type]["duration"]
         vidid = result[query_type]["id"]
-        thumbnail = result[query_type]["thumbnails"][0]["url"].split("?")[0]
+        thumbnail = thumb_url(result[query_type])
         return title, duration_min, thumbnail, vidid
 
     async def download(
@@ -420,38 +531,17 @@ class YouTubeAPI:
         songvideo: Union[bool, str] = None,
         format_id: Union[bool, str] = None,
         title: Union[bool, str] = None,
+        progressive: Union[bool, str] = None,
     ) -> str:
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
 
-        def audio_dl():
-            cookie_file = cookie_txt_file()
-            if not cookie_file:
-                raise Exception("No cookies found. Cannot download audio.")
-            ydl_optssx = {
-                "format": "bestaudio/best",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "cookiefile": cookie_file,
-                "no_warnings": True,
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
-        def video_dl():
-            cookie_file = cookie_txt_file()
+        async def video_dl():
+            cookie_file = cookie_pool.pick()
             if not cookie_file:
                 raise Exception("No cookies found. Cannot download video.")
             ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+                "format": VIDEO_FORMAT,
                 "outtmpl": "downloads/%(id)s.%(ext)s",
                 "geo_bypass": True,
                 "nocheckcertificate": True,
@@ -459,67 +549,20 @@ class YouTubeAPI:
                 "cookiefile": cookie_file,
                 "no_warnings": True,
             }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
-        def song_video_dl():
-            cookie_file = cookie_txt_file()
-            if not cookie_file:
-                raise Exception("No cookies found. Cannot download song video.")
-            formats = f"{format_id}+140"
-            fpath = f"downloads/{title}"
-            ydl_optssx = {
-                "format": formats,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookiefile": cookie_file,
-                "prefer_ffmpeg": True,
-                "merge_output_format": "mp4",
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            x.download([link])
-
-        def song_audio_dl():
-            cookie_file = cookie_txt_file()
-            if not cookie_file:
-                raise Exception("No cookies found. Cannot download song audio.")
-            fpath = f"downloads/{title}.%(ext)s"
-            ydl_optssx = {
-                "format": format_id,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookiefile": cookie_file,
-                "prefer_ffmpeg": True,
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "mp3",
-                        "preferredquality": "192",
-                    }
-                ],
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            x.download([link])
-
-        if songvideo:
-            await download_song(link)
-            fpath = f"downloads/{link}.mp3"
-            return fpath
-        elif songaudio:
-            await download_song(link)
-            fpath = f"downloads/{link}.mp3"
-            return fpath
+            priority = BACKGROUND if throttle.get() else PLAYBACK
+            # the same extraction check_file_size just used, if still fresh
+            info = await extractor.info(
+                link, cookie_file, format=VIDEO_FORMAT, priority=priority
+            )
+            # yt-dlp skips the download itself when the file is already there
+            info = await extractor.download_info(
+                info, ydl_optssx, priority=priority, timeout=DOWNLOAD_TIMEOUT
+            )
+            return os.path.join("downloads", f"{info['id']}.{info['ext']}")
+
+        if songvideo or songaudio:
+            # whichever codec download_song ended up saving
+            return await download_song(link)
         elif video:
             try:
                 downloaded_file = await download_video(link)
@@ -528,38 +571,42 @@ class YouTubeAPI:
                     return downloaded_file, direct
             except Exception as e:
                 print(f"Video API failed: {e}")
-            cookie_file = cookie_txt_file()
+            cookie_file = cookie_pool.pick()
             if not cookie_file:
                 return None, None
             if await is_on_off(1):
                 direct = True
                 downloaded_file = await download_song(link)
             else:
-                proc = await asyncio.create_subprocess_exec(
-                    "yt-dlp",
-                    "--cookies",
-                    cookie_file,
-                    "-g",
-                    "-f",
-                    "best[height<=?720][width<=?1280]",
-                    f"{link}",
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, stderr = await proc.communicate()
-                if stdout:
-                    downloaded_file = stdout.decode().split("\n")[0]
+                try:
+                    downloaded_file = await stream_url(link, cookie_file)
+                except Exception:
+                    downloaded_file = None
+                if downloaded_file:
                     direct = False
                 else:
-                    file_size = await check_file_size(link)
-                    if not file_size:
-                        return None, None
-                    total_size_mb = file_size / (1024 * 1024)
-                    if total_size_mb > 250:
-                        return None, None
                     direct = True
-                    downloaded_file = await loop.run_in_executor(None, video_dl)
+                    video_id = link.split("v=")[-1].split("&")[0]
+                    downloaded_file = media_cache.lookup(video_id, "video")
+                    if not downloaded_file:
+                        file_size = await check_file_size(link)
+                        if not file_size:
+                            return None, None
+                        total_size_mb = file_size / (1024 * 1024)
+                        if total_size_mb > 250:
+                            return None, None
+
+                        async def fallback():
+                            path = await video_dl()
+                            return media_cache.add(path, video_id, "video")
+
+                        downloaded_file = await inflight.run(
+                            f"{video_id}:video", fallback
+                        )
         else:
             direct = True
-            downloaded_file = await download_song(link)
+            if progressive:
+                downloaded_file = await stream_song(link)
+            else:
+                downloaded_file = await download_song(link)
         return downloaded_file, direct
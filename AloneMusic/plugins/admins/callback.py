@@ -12,8 +12,9 @@ import asyncio
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
-from AloneMusic import YouTube, app
+from AloneMusic import app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import STOP, mailboxes
 from AloneMusic.misc import SUDOERS, db
 from AloneMusic.utils.database import (get_active_chats, get_lang,
                                        get_upvote_count, is_active_chat,
@@ -21,13 +22,9 @@ from AloneMusic.utils.database import (get_active_chats, get_lang,
                                        music_off, music_on, set_loop)
 from AloneMusic.utils.decorators.language import languageCB
 from AloneMusic.utils.formatters import seconds_to_min
-from AloneMusic.utils.inline import (close_markup, stream_markup,
-                                     stream_markup_timer)
-from AloneMusic.utils.stream.autoclear import auto_clean
-from AloneMusic.utils.thumbnails import get_thumb
-from config import (BANNED_USERS, SOUNCLOUD_IMG_URL, STREAM_IMG_URL,
-                    TELEGRAM_AUDIO_URL, TELEGRAM_VIDEO_URL, adminlist,
-                    confirmer, votemode)
+from AloneMusic.utils.inline import close_markup, stream_markup_timer
+from AloneMusic.utils.stream.position import positions
+from config import BANNED_USERS, adminlist, confirmer, votemode
 from strings import get_string
 
 checker = {}
@@ -131,7 +128,7 @@ async def del_back_playlist(client, CallbackQuery, _):
             return await CallbackQuery.answer(_["admin_1"], show_alert=True)
         await CallbackQuery.answer()
         await music_off(chat_id)
-        await Alone.pause_stream(chat_id)
+        await mailboxes.run(chat_id, lambda: Alone.pause_stream(chat_id))
         await CallbackQuery.message.reply_text(
             _["admin_2"].format(mention), reply_markup=close_markup(_)
         )
@@ -140,227 +137,54 @@ async def del_back_playlist(client, CallbackQuery, _):
             return await CallbackQuery.answer(_["admin_3"], show_alert=True)
         await CallbackQuery.answer()
         await music_on(chat_id)
-        await Alone.resume_stream(chat_id)
+        await mailboxes.run(chat_id, lambda: Alone.resume_stream(chat_id))
         await CallbackQuery.message.reply_text(
             _["admin_4"].format(mention), reply_markup=close_markup(_)
         )
     elif command == "Stop" or command == "End":
         await CallbackQuery.answer()
-        await Alone.stop_stream(chat_id)
+        await mailboxes.run(chat_id, lambda: Alone.stop_stream(chat_id), kind=STOP)
         await set_loop(chat_id, 0)
         await CallbackQuery.message.reply_text(
             _["admin_5"].format(mention), reply_markup=close_markup(_)
         )
         await CallbackQuery.message.delete()
     elif command == "Skip" or command == "Replay":
+        await CallbackQuery.answer()
         check = db.get(chat_id)
+        old_mystic = check[0].get("mystic") if check else None
         if command == "Skip":
             txt = f"➻ sᴛʀᴇᴀᴍ sᴋɪᴩᴩᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
-            popped = None
-            try:
-                old_mystic = check[0].get("mystic")
-                old_queue_msg = check[0].get("queue_msg")
-                
-                popped = check.pop(0)
-                if popped:
-                    await auto_clean(popped)
-                
-                if old_mystic:
-                    await safe_delete(old_mystic)
-                if old_queue_msg:
-                    await safe_delete(old_queue_msg)
-                
-                if not check:
-                    skip_msg = await CallbackQuery.message.reply_text(txt, reply_markup=close_markup(_))
-                    await Xpbot.stop_stream(chat_id)
-                    await CallbackQuery.message.delete()
-                    await asyncio.sleep(3)
-                    try:
-                        await skip_msg.delete()
-                    except:
-                        pass
-                    return
-            except:
-                try:
-                    old_mystic = check[0].get("mystic") if check else None
-                    old_queue_msg = check[0].get("queue_msg") if check else None
-                    if old_mystic:
-                        await safe_delete(old_mystic)
-                    if old_queue_msg:
-                        await safe_delete(old_queue_msg)
-                except:
-                    pass
-                skip_msg = await CallbackQuery.message.reply_text(txt, reply_markup=close_markup(_))
-                await Xpbot.stop_stream(chat_id)
-                await CallbackQuery.message.delete()
-                await asyncio.sleep(3)
-                try:
-                    await skip_msg.delete()
-                except:
-                    pass
-                return
+            # the next track is announced by Alone itself once it plays
+            result = await Alone.skip(chat_id)
         else:
             txt = f"➻ sᴛʀᴇᴀᴍ ʀᴇ-ᴘʟᴀʏᴇᴅ 🎄\n│ \n└ʙʏ : {mention} 🥀"
-        await CallbackQuery.answer()
-        queued = check[0]["file"]
-        title = (check[0]["title"]).title()
-        user = check[0]["by"]
-        duration = check[0]["dur"]
-        streamtype = check[0]["streamtype"]
-        videoid = check[0]["vidid"]
-        status = True if str(streamtype) == "video" else None
-        db[chat_id][0]["played"] = 0
-        exis = (check[0]).get("old_dur")
-        if exis:
-            db[chat_id][0]["dur"] = exis
-            db[chat_id][0]["seconds"] = check[0]["old_second"]
-            db[chat_id][0]["speed_path"] = None
-            db[chat_id][0]["speed"] = 1.0
-        if "live_" in queued:
-            n, link = await YouTube.video(videoid, True)
-            if n == 0:
-                return await CallbackQuery.message.reply_text(
-                    text=_["admin_7"].format(title),
-                    reply_markup=close_markup(_),
-                )
-            try:
-                image = await YouTube.thumbnail(videoid, True)
-            except:
-                image = None
-            try:
-                await Alone.skip_stream(chat_id, link, video=status, image=image)
-            except:
-                return await CallbackQuery.message.reply_text(_["call_6"])
-            button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
-                photo=img,
-                has_spoiler=True,
-                caption=_["stream_1"].format(
-                    f"https://t.me/{app.username}?start=info_{videoid}",
-                    title[:23],
-                    duration,
-                    user,
-                ),
-                reply_markup=InlineKeyboardMarkup(button),
-            )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
-            await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
-        elif "vid_" in queued:
-            mystic = await CallbackQuery.message.reply_text(
-                _["call_7"], disable_web_page_preview=True
-            )
-            try:
-                file_path, direct = await YouTube.download(
-                    videoid,
-                    mystic,
-                    videoid=True,
-                    video=status,
-                )
-            except:
-                return await mystic.edit_text(_["call_6"])
-            try:
-                image = await YouTube.thumbnail(videoid, True)
-            except:
-                image = None
+            result = await Alone.replay(chat_id)
+        if result is None:
+            return
+        if result != "failed" and old_mystic:
             try:
-                await Alone.skip_stream(chat_id, file_path, video=status, image=image)
+                await old_mystic.delete()
             except:
-                return await mystic.edit_text(_["call_6"])
-            button = stream_markup(_, chat_id)
-            img = await get_thumb(videoid)
-            run = await CallbackQuery.message.reply_photo(
-                photo=img,
-                has_spoiler=True,
-                caption=_["stream_1"].format(
-                    f"https://t.me/{app.username}?start=info_{videoid}",
-                    title[:23],
-                    duration,
-                    user,
-                ),
-                reply_markup=InlineKeyboardMarkup(button),
+                pass
+        if result == "ended":
+            skip_msg = await CallbackQuery.message.reply_text(
+                txt, reply_markup=close_markup(_)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
-            await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
-            await mystic.delete()
-        elif "index_" in queued:
             try:
-                await Alone.skip_stream(chat_id, videoid, video=status)
+                await CallbackQuery.message.delete()
             except:
-                return await CallbackQuery.message.reply_text(_["call_6"])
-            button = stream_markup(_, chat_id)
-            run = await CallbackQuery.message.reply_photo(
-                photo=STREAM_IMG_URL,
-                has_spoiler=True,
-                caption=_["stream_2"].format(user),
-                reply_markup=InlineKeyboardMarkup(button),
-            )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
-            await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
-        else:
-            if videoid == "telegram":
-                image = None
-            elif videoid == "soundcloud":
-                image = None
-            else:
-                try:
-                    image = await YouTube.thumbnail(videoid, True)
-                except:
-                    image = None
+                pass
+            await asyncio.sleep(3)
             try:
-                await Alone.skip_stream(chat_id, queued, video=status, image=image)
+                await skip_msg.delete()
             except:
-                return await CallbackQuery.message.reply_text(_["call_6"])
-            if videoid == "telegram":
-                button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
-                    photo=(
-                        TELEGRAM_AUDIO_URL
-                        if str(streamtype) == "audio"
-                        else TELEGRAM_VIDEO_URL
-                    ),
-                    caption=_["stream_1"].format(
-                        config.SUPPORT_CHAT, title[:23], duration, user
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-            elif videoid == "soundcloud":
-                button = stream_markup(_, chat_id)
-                run = await CallbackQuery.message.reply_photo(
-                    photo=(
-                        SOUNCLOUD_IMG_URL
-                        if str(streamtype) == "audio"
-                        else TELEGRAM_VIDEO_URL
-                    ),
-                    caption=_["stream_1"].format(
-                        config.SUPPORT_CHAT, title[:23], duration, user
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
-            else:
-                button = stream_markup(_, chat_id)
-                img = await get_thumb(videoid)
-                run = await CallbackQuery.message.reply_photo(
-                    photo=img,
-                    has_spoiler=True,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{videoid}",
-                        title[:23],
-                        duration,
-                        user,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                pass
+            return
+        try:
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
+        except:
+            pass
 
 
 async def markup_timer():
@@ -395,7 +219,7 @@ async def markup_timer():
                     buttons = stream_markup_timer(
                         _,
                         chat_id,
-                        seconds_to_min(playing[0]["played"]),
+                        seconds_to_min(positions.played(chat_id)),
                         playing[0]["dur"],
                     )
                     await mystic.edit_reply_markup(
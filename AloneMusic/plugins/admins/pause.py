@@ -12,6 +12,7 @@ from pyrogram.types import Message
 
 from AloneMusic import app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import mailboxes
 from AloneMusic.utils.database import is_music_playing, music_off
 from AloneMusic.utils.decorators import AdminRightsCheck
 from AloneMusic.utils.inline import close_markup
@@ -24,7 +25,7 @@ async def pause_admin(cli, message: Message, _, chat_id):
     if not await is_music_playing(chat_id):
         return await message.reply_text(_["admin_1"])
     await music_off(chat_id)
-    await Alone.pause_stream(chat_id)
+    await mailboxes.run(chat_id, lambda: Alone.pause_stream(chat_id))
     await message.reply_text(
         _["admin_2"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
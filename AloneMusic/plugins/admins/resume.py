@@ -12,6 +12,7 @@ from pyrogram.types import Message
 
 from AloneMusic import app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import mailboxes
 from AloneMusic.utils.database import is_music_playing, music_on
 from AloneMusic.utils.decorators import AdminRightsCheck
 from AloneMusic.utils.inline import close_markup
@@ -24,7 +25,7 @@ async def resume_com(cli, message: Message, _, chat_id):
     if await is_music_playing(chat_id):
         return await message.reply_text(_["admin_3"])
     await music_on(chat_id)
-    await Alone.resume_stream(chat_id)
+    await mailboxes.run(chat_id, lambda: Alone.resume_stream(chat_id))
     await message.reply_text(
         _["admin_4"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
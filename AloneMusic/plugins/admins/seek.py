@@ -12,9 +12,11 @@ from pyrogram.types import Message
 
 from AloneMusic import YouTube, app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import mailboxes
 from AloneMusic.misc import db
 from AloneMusic.utils import AdminRightsCheck, seconds_to_min
 from AloneMusic.utils.inline import close_markup
+from AloneMusic.utils.stream.position import positions
 from config import BANNED_USERS
 
 
@@ -36,8 +38,7 @@ async def seek_comm(cli, message: Message, _, chat_id):
     duration_seconds = int(playing[0]["seconds"])
     if duration_seconds == 0:
         return await message.reply_text(_["admin_22"])
-    file_path = playing[0]["file"]
-    duration_played = int(playing[0]["played"])
+    duration_played = positions.played(chat_id)
     duration_to_skip = int(query)
     duration = playing[0]["dur"]
     if message.command[0][-2] == "c":
@@ -46,38 +47,55 @@ async def seek_comm(cli, message: Message, _, chat_id):
                 text=_["admin_23"].format(seconds_to_min(duration_played), duration),
                 reply_markup=close_markup(_),
             )
-        to_seek = duration_played - duration_to_skip + 1
     else:
         if (duration_seconds - (duration_played + duration_to_skip)) <= 10:
             return await message.reply_text(
                 text=_["admin_23"].format(seconds_to_min(duration_played), duration),
                 reply_markup=close_markup(_),
             )
-        to_seek = duration_played + duration_to_skip + 1
+    back = message.command[0][-2] == "c"
+    entry = playing[0]
     mystic = await message.reply_text(_["admin_24"])
-    if "vid_" in file_path:
-        n, file_path = await YouTube.video(playing[0]["vidid"], True)
-        if n == 0:
-            return await message.reply_text(_["admin_22"])
-    check = (playing[0]).get("speed_path")
-    if check:
-        file_path = check
-    if "index_" in file_path:
-        file_path = playing[0]["vidid"]
-    try:
+
+    async def seek():
+        # another command may have moved the stream while this one waited
+        if not db.get(chat_id) or db[chat_id][0] is not entry:
+            return None
+        played = positions.played(chat_id)
+        if back:
+            to_seek = max(played - duration_to_skip, 0) + 1
+        else:
+            to_seek = played + duration_to_skip + 1
+        file_path = entry["file"]
+        if "vid_" in file_path:
+            n, file_path = await YouTube.video(entry["vidid"], True)
+            if n == 0:
+                return None
+        speed = 1.0
+        check = entry.get("speed_path")
+        if check:
+            file_path = check
+        else:
+            speed = entry.get("speed") or 1.0
+        if "index_" in file_path:
+            file_path = entry["vidid"]
         await Alone.seek_stream(
             chat_id,
             file_path,
             seconds_to_min(to_seek),
-            duration,
-            playing[0]["streamtype"],
+            entry["dur"],
+            entry["streamtype"],
+            speed,
         )
+        positions.seek(chat_id, to_seek)
+        return to_seek
+
+    try:
+        to_seek = await mailboxes.run(chat_id, seek)
     except:
+        to_seek = None
+    if to_seek is None:
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
-    if message.command[0][-2] == "c":
-        db[chat_id][0]["played"] -= duration_to_skip
-    else:
-        db[chat_id][0]["played"] += duration_to_skip
     await mystic.edit_text(
         text=_["admin_25"].format(seconds_to_min(to_seek), message.from_user.mention),
         reply_markup=close_markup(_),
@@ -13,9 +13,11 @@ from pyrogram import filters
 from pyrogram.types import Message
 
 from AloneMusic import app
+from AloneMusic.core.mailbox import mailboxes
 from AloneMusic.misc import db
 from AloneMusic.utils.decorators import AdminRightsCheck
 from AloneMusic.utils.inline import close_markup
+from AloneMusic.utils.stream.prefetch import prefetcher
 from config import BANNED_USERS
 
 
@@ -27,16 +29,19 @@ async def admins(Client, message: Message, _, chat_id):
     check = db.get(chat_id)
     if not check:
         return await message.reply_text(_["queue_2"])
-    try:
-        popped = check.pop(0)
-    except:
-        return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    check = db.get(chat_id)
-    if not check:
-        check.insert(0, popped)
+
+    async def shuffle():
+        check = db.get(chat_id)
+        if not check or len(check) < 2:
+            return False
+        upcoming = check[1:]
+        random.shuffle(upcoming)
+        check[1:] = upcoming
+        prefetcher.wake()
+        return True
+
+    if not await mailboxes.run(chat_id, shuffle):
         return await message.reply_text(_["admin_15"], reply_markup=close_markup(_))
-    random.shuffle(check)
-    check.insert(0, popped)
     await message.reply_text(
         _["admin_16"].format(message.from_user.mention), reply_markup=close_markup(_)
     )
@@ -12,11 +12,13 @@ from pyrogram.types import Message
 
 from AloneMusic import app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import mailboxes
 from AloneMusic.misc import SUDOERS, db
 from AloneMusic.utils import AdminRightsCheck
 from AloneMusic.utils.database import is_active_chat, is_nonadmin_chat
 from AloneMusic.utils.decorators.language import languageCB
 from AloneMusic.utils.inline import close_markup, speed_markup
+from AloneMusic.utils.stream.speed import MAX_SPEED, MIN_SPEED, parse_speed
 from config import BANNED_USERS, adminlist
 
 checker = []
@@ -38,6 +40,22 @@ async def playback(cli, message: Message, _, chat_id):
     file_path = playing[0]["file"]
     if "downloads" not in file_path:
         return await message.reply_text(_["admin_27"])
+    if len(message.command) > 1:
+        # any speed in range, e.g. /speed 1.25
+        speed = parse_speed(message.command[1])
+        if speed is None:
+            return await message.reply_text(
+                _["admin_41"].format(f"{MIN_SPEED:g}", f"{MAX_SPEED:g}")
+            )
+        if chat_id in checker:
+            return await message.reply_text(_["admin_30"])
+        checker.append(chat_id)
+        mystic = await message.reply_text(
+            _["admin_32"].format(message.from_user.mention)
+        )
+        return await change_speed(
+            chat_id, file_path, speed, playing, mystic, message.from_user.mention, _
+        )
     upl = speed_markup(_, chat_id)
     return await message.reply_text(
         text=_["admin_28"].format(app.mention),
@@ -52,6 +70,9 @@ async def del_back_playlist(client, CallbackQuery, _):
     callback_request = callback_data.split(None, 1)[1]
     chat, speed = callback_request.split("|")
     chat_id = int(chat)
+    speed = parse_speed(speed)
+    if speed is None:
+        return await CallbackQuery.answer()
     if not await is_active_chat(chat_id):
         return await CallbackQuery.answer(_["general_5"], show_alert=True)
     is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
@@ -72,20 +93,12 @@ async def del_back_playlist(client, CallbackQuery, _):
     file_path = playing[0]["file"]
     if "downloads" not in file_path:
         return await CallbackQuery.answer(_["admin_27"], show_alert=True)
-    checkspeed = (playing[0]).get("speed")
-    if checkspeed:
-        if str(checkspeed) == str(speed):
-            if str(speed) == str("1.0"):
-                return await CallbackQuery.answer(
-                    _["admin_29"],
-                    show_alert=True,
-                )
-    else:
-        if str(speed) == str("1.0"):
-            return await CallbackQuery.answer(
-                _["admin_29"],
-                show_alert=True,
-            )
+    checkspeed = float((playing[0]).get("speed") or 1.0)
+    if speed == 1.0 and checkspeed == 1.0:
+        return await CallbackQuery.answer(
+            _["admin_29"],
+            show_alert=True,
+        )
     if chat_id in checker:
         return await CallbackQuery.answer(
             _["admin_30"],
@@ -102,12 +115,22 @@ async def del_back_playlist(client, CallbackQuery, _):
     mystic = await CallbackQuery.edit_message_text(
         text=_["admin_32"].format(CallbackQuery.from_user.mention),
     )
+    await change_speed(
+        chat_id,
+        file_path,
+        speed,
+        playing,
+        mystic,
+        CallbackQuery.from_user.mention,
+        _,
+    )
+
+
+async def change_speed(chat_id, file_path, speed, playing, mystic, mention, _):
     try:
-        await Alone.speedup_stream(
+        await mailboxes.run(
             chat_id,
-            file_path,
-            speed,
-            playing,
+            lambda: Alone.speedup_stream(chat_id, file_path, speed, playing),
         )
     except:
         if chat_id in checker:
@@ -116,6 +139,6 @@ async def del_back_playlist(client, CallbackQuery, _):
     if chat_id in checker:
         checker.remove(chat_id)
     await mystic.edit_text(
-        text=_["admin_34"].format(speed, CallbackQuery.from_user.mention),
+        text=_["admin_34"].format(f"{speed:g}", mention),
         reply_markup=close_markup(_),
     )
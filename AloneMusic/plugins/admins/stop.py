@@ -12,6 +12,7 @@ from pyrogram.types import Message
 
 from AloneMusic import app
 from AloneMusic.core.call import Alone
+from AloneMusic.core.mailbox import STOP, mailboxes
 from AloneMusic.utils.database import set_loop
 from AloneMusic.utils.decorators import AdminRightsCheck
 from AloneMusic.utils.inline import close_markup
@@ -25,7 +26,7 @@ from config import BANNED_USERS
 async def stop_music(cli, message: Message, _, chat_id):
     if not len(message.command) == 1:
         return
-    await Alone.stop_stream(chat_id)
+    await mailboxes.run(chat_id, lambda: Alone.stop_stream(chat_id), kind=STOP)
     await set_loop(chat_id, 0)
     await message.reply_text(
         _["admin_5"].format(message.from_user.mention), reply_markup=close_markup(_)
@@ -8,14 +8,11 @@
 # All rights reserved.
 
 import asyncio
-from datetime import datetime
 
 from pyrogram.enums import ChatType
 
 import config
-from AloneMusic import app
-from AloneMusic.core.call import Alone, autoend
-from AloneMusic.utils.database import get_client, is_active_chat, is_autoend
+from AloneMusic.utils.database import get_client, is_active_chat
 
 
 async def auto_leave():
@@ -52,33 +49,3 @@ async def auto_leave():
 
 
 asyncio.create_task(auto_leave())
-
-
-async def auto_end():
-    while not await asyncio.sleep(5):
-        ender = await is_autoend()
-        if not ender:
-            continue
-        for chat_id in autoend:
-            timer = autoend.get(chat_id)
-            if not timer:
-                continue
-            if datetime.now() > timer:
-                if not await is_active_chat(chat_id):
-                    autoend[chat_id] = {}
-                    continue
-                autoend[chat_id] = {}
-                try:
-                    await Alone.stop_stream(chat_id)
-                except:
-                    continue
-                try:
-                    await app.send_message(
-                        chat_id,
-                        "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
-                    )
-                except:
-                    continue
-
-
-asyncio.create_task(auto_end())
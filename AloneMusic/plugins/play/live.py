@@ -7,6 +7,8 @@
 #
 # All rights reserved.
 
+import time
+
 from pyrogram import filters
 
 from AloneMusic import YouTube, app
@@ -19,6 +21,7 @@ from config import BANNED_USERS
 @app.on_callback_query(filters.regex("LiveStream") & ~BANNED_USERS)
 @languageCB
 async def play_live_stream(client, CallbackQuery, _):
+    started = time.monotonic()
     callback_data = CallbackQuery.data.strip()
     callback_request = callback_data.split(None, 1)[1]
     vidid, user_id, mode, cplay, fplay = callback_request.split("|")
@@ -59,6 +62,7 @@ async def play_live_stream(client, CallbackQuery, _):
                 video,
                 streamtype="live",
                 forceplay=ffplay,
+                started=started,
             )
         except Exception as e:
             ex_type = type(e).__name__
@@ -9,6 +9,7 @@
 import asyncio
 import random
 import string
+import time
 
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardMarkup, InputMediaPhoto, Message
@@ -85,6 +86,7 @@ async def play_commnd(
     playmode,
     url,
     fplay,
+    started,
 ):
     emoji = random.choice(EMOJII)
 
@@ -143,6 +145,7 @@ async def play_commnd(
                     message.chat.id,
                     streamtype="telegram",
                     forceplay=fplay,
+                    started=started,
                 )
             except Exception as e:
                 ex_type = type(e).__name__
@@ -187,6 +190,7 @@ async def play_commnd(
                     video=True,
                     streamtype="telegram",
                     forceplay=fplay,
+                    started=started,
                 )
             except Exception as e:
                 ex_type = type(e).__name__
@@ -200,7 +204,7 @@ async def play_commnd(
                 try:
                     details = await YouTube.playlist(
                         url,
-                        config.PLAYLIST_FETCH_LIMIT,
+                        config.PLAYLIST_LAZY_LIMIT,
                         message.from_user.id,
                     )
                 except:
@@ -320,6 +324,7 @@ async def play_commnd(
                     message.chat.id,
                     streamtype="soundcloud",
                     forceplay=fplay,
+                    started=started,
                 )
             except Exception as e:
                 ex_type = type(e).__name__
@@ -350,6 +355,7 @@ async def play_commnd(
                     video=video,
                     streamtype="index",
                     forceplay=fplay,
+                    started=started,
                 )
             except Exception as e:
                 ex_type = type(e).__name__
@@ -407,6 +413,7 @@ async def play_commnd(
                 streamtype=streamtype,
                 spotify=spotify,
                 forceplay=fplay,
+                started=started,
             )
         except Exception as e:
             ex_type = type(e).__name__
@@ -478,6 +485,7 @@ async def play_commnd(
 @app.on_callback_query(filters.regex("MusicStream") & ~BANNED_USERS)
 @languageCB
 async def play_music(client, CallbackQuery, _):
+    started = time.monotonic()
     callback_data = CallbackQuery.data.strip()
     callback_request = callback_data.split(None, 1)[1]
     vidid, user_id, mode, cplay, fplay = callback_request.split("|")
@@ -536,6 +544,7 @@ async def play_music(client, CallbackQuery, _):
             video,
             streamtype="youtube",
             forceplay=ffplay,
+            started=started,
         )
     except Exception as e:
         ex_type = type(e).__name__
@@ -558,6 +567,7 @@ async def anonymous_check(client, CallbackQuery):
 @app.on_callback_query(filters.regex("AnonyPlaylists") & ~BANNED_USERS)
 @languageCB
 async def play_playlists_command(client, CallbackQuery, _):
+    started = time.monotonic()
     callback_data = CallbackQuery.data.strip()
     callback_request = callback_data.split(None, 1)[1]
     (
@@ -595,7 +605,7 @@ async def play_playlists_command(client, CallbackQuery, _):
         try:
             result = await YouTube.playlist(
                 videoid,
-                config.PLAYLIST_FETCH_LIMIT,
+                config.PLAYLIST_LAZY_LIMIT,
                 CallbackQuery.from_user.id,
                 True,
             )
@@ -634,6 +644,7 @@ async def play_playlists_command(client, CallbackQuery, _):
             streamtype="playlist",
             spotify=spotify,
             forceplay=ffplay,
+            started=started,
         )
     except Exception as e:
         ex_type = type(e).__name__
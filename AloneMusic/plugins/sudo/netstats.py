@@ -0,0 +1,204 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from AloneMusic import YouTube, app, userbot
+from AloneMusic.core.backends import backends
+from AloneMusic.core.call import transition_gaps
+from AloneMusic.core.cookies import cookie_pool
+from AloneMusic.core.extractor import extractor
+from AloneMusic.core.health import monitor
+from AloneMusic.core.http import http
+from AloneMusic.core.mailbox import mailboxes
+from AloneMusic.core.placement import placement
+from AloneMusic.misc import SUDOERS
+from AloneMusic.platforms.Youtube import benchmark_audio
+from AloneMusic.utils.downloader import downloader
+from AloneMusic.utils.metadata import search_cache, video_meta
+from AloneMusic.utils.stream.prefetch import prefetcher
+from AloneMusic.utils.stream.speed import variants
+from AloneMusic.utils.stream.stream import play_latency
+from AloneMusic.utils.stream.urls import stream_urls
+
+
+@app.on_message(filters.command(["netstats", "httpstats"]) & SUDOERS)
+async def net_stats(_, message: Message):
+    text = "<b>» ʜᴛᴛᴘ ᴄʟɪᴇɴᴛ ᴘᴏᴏʟ :</b>\n\n"
+    hosts = http.stats()
+    if not hosts:
+        text += "ɴᴏ ʀᴇǫᴜᴇsᴛs ʏᴇᴛ.\n"
+    for host, s in list(hosts.items())[:15]:
+        text += (
+            f"<code>{host}</code>\n"
+            f"ʀᴇǫ: {s.requests} | ᴇʀʀ: {s.errors} | "
+            f"ᴀᴠɢ: {s.avg}ᴍs | ᴍᴀx: {s.max}ᴍs | ʟᴀsᴛ: {s.last}ᴍs\n\n"
+        )
+    meta = video_meta.stats()
+    text += (
+        f"<b>» ᴍᴇᴛᴀᴅᴀᴛᴀ ᴄᴀᴄʜᴇ :</b>\n\n"
+        f"sɪᴢᴇ: {meta['size']} | ɪɴ-ғʟɪɢʜᴛ: {meta['inflight']}\n"
+        f"ʜɪᴛs: {meta['hits']} | ᴍɪssᴇs: {meta['misses']}"
+    )
+    search = search_cache.stats()
+    text += (
+        f"\n\n<b>» sᴇᴀʀᴄʜ ᴄᴀᴄʜᴇ :</b>\n\n"
+        f"sɪᴢᴇ: {search['size']} | ʜɪᴛs: {search['hits']} | "
+        f"ᴍᴏɴɢᴏ: {search['stored']} | ᴍɪssᴇs: {search['misses']}"
+    )
+    urls = stream_urls.stats()
+    text += (
+        f"\n\n<b>» sᴛʀᴇᴀᴍ ᴜʀʟ ᴄᴀᴄʜᴇ :</b>\n\n"
+        f"sɪᴢᴇ: {urls['size']} | ʜɪᴛs: {urls['hits']} | ᴍɪssᴇs: {urls['misses']} | "
+        f"ɪɴᴠᴀʟɪᴅᴀᴛᴇᴅ: {urls['invalidated']}"
+    )
+    ex = extractor.stats()
+    text += (
+        f"\n\n<b>» ʏᴛ-ᴅʟᴘ ᴘᴏᴏʟ :</b>\n\n"
+        f"ᴡᴏʀᴋᴇʀs: {ex['workers']} | ʀᴜɴɴɪɴɢ: {ex['running']} | ǫᴜᴇᴜᴇᴅ: {ex['queued']}\n"
+        f"ᴅᴏɴᴇ: {ex['completed']} | ғᴀɪʟᴇᴅ: {ex['failed']} | ᴛɪᴍᴇᴏᴜᴛs: {ex['timeouts']} | "
+        f"ʀᴇsᴛᴀʀᴛs: {ex['restarts']}"
+    )
+    text += "\n\n<b>» ᴅᴏᴡɴʟᴏᴀᴅ ʙᴀᴄᴋᴇɴᴅs :</b>\n"
+    for b in backends.stats():
+        p50 = f"{b['p50']:.2f}s" if b["p50"] is not None else "-"
+        p95 = f"{b['p95']:.2f}s" if b["p95"] is not None else "-"
+        state = b["state"] + (f" {b['reopens']}s" if b["reopens"] else "")
+        text += (
+            f"\n<b>{b['name']}</b> [{state}]\n"
+            f"ᴏᴋ: {b['success']}% | ᴘ50: {p50} | ᴘ95: {p95} | "
+            f"ʜᴇᴅɢᴇᴅ: {b['hedged']} | ᴡᴏɴ: {b['won']}"
+        )
+    pre = prefetcher.stats()
+    text += (
+        f"\n\n<b>» ǫᴜᴇᴜᴇ ᴘʀᴇғᴇᴛᴄʜ :</b>\n\n"
+        f"ʀᴜɴɴɪɴɢ: {pre['running']} | ʀᴇᴀᴅʏ: {pre['done']} | "
+        f"ʀᴇsᴏʟᴠɪɴɢ: {pre['resolving']}"
+    )
+    box = mailboxes.stats()
+    text += (
+        f"\n\n<b>» ᴄʜᴀᴛ ᴍᴀɪʟʙᴏxᴇs :</b>\n\n"
+        f"ʙᴜsʏ: {box['chats']} | ǫᴜᴇᴜᴇᴅ: {box['queued']} | ʀᴀɴ: {box['ran']} | "
+        f"ᴄᴏʟʟᴀᴘsᴇᴅ: {box['collapsed']} | sᴛᴀʟᴇ: {box['stale']}"
+    )
+    var = variants.stats()
+    text += (
+        f"\n\n<b>» sᴘᴇᴇᴅ ᴠᴀʀɪᴀɴᴛs :</b>\n\n"
+        f"ғɪʟᴇs: {var['files']} ({var['size'] // 1048576} ᴍʙ) | "
+        f"ʀᴇɴᴅᴇʀɪɴɢ: {var['rendering']} | ʀᴇɴᴅᴇʀᴇᴅ: {var['rendered']} | "
+        f"ʜɪᴛs: {var['hits']}"
+    )
+    recent = list(downloader.history)[-5:]
+    if recent:
+        text += "\n\n<b>» ʀᴇᴄᴇɴᴛ ᴅᴏᴡɴʟᴏᴀᴅs :</b>\n\n"
+    for d in reversed(recent):
+        text += (
+            f"<code>{d['file']}</code>\n"
+            f"{d['size'] / 1048576:.1f} MB ɪɴ {d['seconds']}s | "
+            f"{d['rate'] / 1048576:.2f} MB/s | {d['connections']} ᴄᴏɴɴ\n"
+        )
+    if play_latency:
+        times = sorted(t for _, t in play_latency)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        text += (
+            f"\n<b>» ᴘʟᴀʏ ᴛᴏ ᴀᴜᴅɪᴏ :</b>\n\n"
+            f"ʟᴀsᴛ {len(times)} | ᴀᴠɢ: {sum(times) / len(times):.2f}s | "
+            f"ᴘ95: {p95:.2f}s | ʟᴀsᴛ: {play_latency[-1][1]:.2f}s\n"
+        )
+    if transition_gaps:
+        gaps = sorted(t for _, t in transition_gaps)
+        p95 = gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))]
+        text += (
+            f"\n<b>» ɢᴀᴘ ʙᴇᴛᴡᴇᴇɴ ᴛʀᴀᴄᴋs :</b>\n\n"
+            f"ʟᴀsᴛ {len(gaps)} | ᴀᴠɢ: {sum(gaps) / len(gaps):.2f}s | "
+            f"ᴘ95: {p95:.2f}s | ʟᴀsᴛ: {transition_gaps[-1][1]:.2f}s\n"
+        )
+    await message.reply_text(text)
+
+
+@app.on_message(filters.command(["cookiestats", "cookies"]) & SUDOERS)
+async def cookie_stats(_, message: Message):
+    cookies = cookie_pool.stats()
+    if not cookies:
+        return await message.reply_text("ɴᴏ ᴄᴏᴏᴋɪᴇ ғɪʟᴇs ғᴏᴜɴᴅ ɪɴ ᴄᴏᴏᴋɪᴇs/.")
+    text = "<b>» ᴄᴏᴏᴋɪᴇ ᴘᴏᴏʟ :</b>\n\n"
+    for c in cookies:
+        state = f"ǫᴜᴀʀᴀɴᴛɪɴᴇᴅ {c['quarantined']}s" if c["quarantined"] else "ʜᴇᴀʟᴛʜʏ"
+        text += (
+            f"<code>{c['name']}</code> - {state}\n"
+            f"ᴏᴋ: {c['successes']} | ғᴀɪʟ: {c['failures']} | "
+            f"ᴀᴠɢ: {c['latency']}ᴍs | ʟᴀsᴛ ᴍɪɴ: {c['recent']}\n"
+        )
+        if c["error"]:
+            text += f"<i>{c['error'][:100]}</i>\n"
+        text += "\n"
+    await message.reply_text(text)
+
+
+@app.on_message(filters.command(["audiobench"]) & SUDOERS)
+async def audio_bench(_, message: Message):
+    if len(message.command) < 2:
+        return await message.reply_text(
+            "<b>ᴇxᴀᴍᴘʟᴇ :</b>\n\n/audiobench [ʏᴏᴜᴛᴜʙᴇ ʟɪɴᴋ ᴏʀ ᴠɪᴅᴇᴏ ɪᴅ]"
+        )
+    link = message.command[1]
+    if not link.startswith("http"):
+        link = YouTube.base + link
+    mystic = await message.reply_text("ʙᴇɴᴄʜᴍᴀʀᴋɪɴɢ ᴀᴜᴅɪᴏ ᴘᴀᴛʜs...")
+    try:
+        results = await benchmark_audio(link)
+    except Exception as e:
+        return await mystic.edit_text(f"ʙᴇɴᴄʜᴍᴀʀᴋ ғᴀɪʟᴇᴅ: <code>{e}</code>")
+    text = "<b>» ᴀᴜᴅɪᴏ ᴘᴀᴛʜs :</b>\n\n"
+    for r in results:
+        if not r["size"]:
+            text += f"<b>{r['source']}</b>: ᴜɴᴀᴠᴀɪʟᴀʙʟᴇ\n\n"
+            continue
+        cpu = f"{r['cpu']:.2f}s" if r["cpu"] is not None else "?"
+        text += (
+            f"<b>{r['source']}</b> ({r['codec']})\n"
+            f"{r['size'] / 1048576:.2f} MB ɪɴ {r['seconds']}s | ᴅᴇᴄᴏᴅᴇ ᴄᴘᴜ: {cpu}\n\n"
+        )
+    native, api = results
+    if native["size"] and api["size"]:
+        text += (
+            f"ɴᴀᴛɪᴠᴇ ɪs {native['size'] / api['size'] * 100:.0f}% ᴏғ ᴛʜᴇ ᴍᴘ3 ʙʏᴛᴇs "
+            f"ᴀɴᴅ {native['seconds'] / max(api['seconds'], 0.01) * 100:.0f}% ᴏғ ɪᴛs ᴛɪᴍᴇ."
+        )
+    await mystic.edit_text(text)
+
+
+@app.on_message(filters.command(["assistants", "placement"]) & SUDOERS)
+async def assistant_stats(_, message: Message):
+    loads = placement.stats()
+    if not loads:
+        return await message.reply_text("ɴᴏ ᴀssɪsᴛᴀɴᴛs ᴀʀᴇ ʀᴜɴɴɪɴɢ.")
+    checks = monitor.stats()
+    text = f"<b>» ᴀssɪsᴛᴀɴᴛ ʟᴏᴀᴅ :</b> (ᴄᴀᴘᴀᴄɪᴛʏ {placement.capacity})\n\n"
+    for a in loads:
+        client = userbot.get(a["number"])
+        name = getattr(client, "name", None) or f"ᴀssɪsᴛᴀɴᴛ {a['number']}"
+        health = checks["assistants"].get(a["number"], {})
+        if a["down"]:
+            state = f"ᴅᴏᴡɴ: {health.get('error')}"
+        elif a["flood"]:
+            state = f"ғʟᴏᴏᴅ {a['flood']}s"
+        else:
+            state = "ʜᴇᴀʟᴛʜʏ"
+        text += (
+            f"<b>{a['number']}.</b> {name} [{state}]\n"
+            f"ᴄᴀʟʟs: {a['calls']} | ᴠɪᴅᴇᴏ: {a['video']} | ᴘᴇɴᴅɪɴɢ: {a['pending']} | "
+            f"ʟᴏᴀᴅ: {a['weight']} | ᴘʟᴀᴄᴇᴅ: {a['placed']} | ғʟᴏᴏᴅs: {a['floods']}\n\n"
+        )
+    text += (
+        f"<b>» ᴍɪɢʀᴀᴛᴇᴅ :</b> {checks['migrated']} | "
+        f"ғᴀɪʟᴇᴅ: {checks['migrate_failed']}"
+    )
+    await message.reply_text(text)
@@ -23,6 +23,7 @@ from AloneMusic.misc import HAPP, SUDOERS, XCB
 from AloneMusic.utils.database import (get_active_chats, remove_active_chat,
                                        remove_active_video_chat)
 from AloneMusic.utils.decorators.language import language
+from AloneMusic.utils.stream.cache import media_cache
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -132,8 +133,8 @@ async def restart_(_, message):
         except:
             pass
 
+    media_cache.flush()
     try:
-        shutil.rmtree("downloads")
         shutil.rmtree("raw_files")
         shutil.rmtree("cache")
     except:
@@ -22,6 +22,7 @@ from AloneMusic.utils.database import (get_cmode, is_active_chat,
                                        is_music_playing)
 from AloneMusic.utils.decorators.language import language, languageCB
 from AloneMusic.utils.inline import queue_back_markup, queue_markup
+from AloneMusic.utils.stream.position import positions
 from config import BANNED_USERS
 
 basic = {}
@@ -102,7 +103,7 @@ async def get_queue(client, message: Message, _):
             DUR,
             "c" if cplay else "g",
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(positions.played(chat_id)),
             got[0]["dur"],
         )
     )
@@ -121,7 +122,7 @@ async def get_queue(client, message: Message, _):
                                     DUR,
                                     "c" if cplay else "g",
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(positions.played(chat_id)),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
@@ -242,7 +243,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
             DUR,
             cplay,
             videoid,
-            seconds_to_min(got[0]["played"]),
+            seconds_to_min(positions.played(chat_id)),
             got[0]["dur"],
         )
     )
@@ -263,7 +264,7 @@ async def queue_back(client, CallbackQuery: CallbackQuery, _):
                                     DUR,
                                     cplay,
                                     videoid,
-                                    seconds_to_min(db[chat_id][0]["played"]),
+                                    seconds_to_min(positions.played(chat_id)),
                                     db[chat_id][0]["dur"],
                                 )
                                 await mystic.edit_reply_markup(reply_markup=buttons)
@@ -7,7 +7,6 @@
 #
 # All rights reserved.
 
-import random
 from typing import Dict, List, Union
 
 from AloneMusic import userbot
@@ -56,16 +55,7 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return userbot.get(assistant)
 
 
 async def set_assistant_new(chat_id, number):
@@ -78,9 +68,9 @@ async def set_assistant_new(chat_id, number):
 
 
 async def set_assistant(chat_id):
-    from AloneMusic.core.userbot import assistants
+    from AloneMusic.core.placement import placement
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.pick(chat_id)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -92,7 +82,7 @@ async def set_assistant(chat_id):
 
 
 async def get_assistant(chat_id: int) -> str:
-    from AloneMusic.core.userbot import assistants
+    from AloneMusic.core.placement import placement
 
     assistant = assistantdict.get(chat_id)
     if not assistant:
@@ -102,7 +92,7 @@ async def get_assistant(chat_id: int) -> str:
             return userbot
         else:
             got_assis = dbassistant["assistant"]
-            if got_assis in assistants:
+            if placement.usable(chat_id, got_assis):
                 assistantdict[chat_id] = got_assis
                 userbot = await get_client(got_assis)
                 return userbot
@@ -110,7 +100,7 @@ async def get_assistant(chat_id: int) -> str:
                 userbot = await set_assistant(chat_id)
                 return userbot
     else:
-        if assistant in assistants:
+        if placement.usable(chat_id, assistant):
             userbot = await get_client(assistant)
             return userbot
         else:
@@ -119,9 +109,9 @@ async def get_assistant(chat_id: int) -> str:
 
 
 async def set_calls_assistant(chat_id):
-    from AloneMusic.core.userbot import assistants
+    from AloneMusic.core.placement import placement
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.pick(chat_id)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -151,16 +141,7 @@ async def group_assistant(self, chat_id: int) -> int:
             assis = assistant
         else:
             assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return self.calls.get(int(assis))
 
 
 async def is_skipmode(chat_id: int) -> bool:
@@ -209,19 +190,22 @@ async def set_upvotes(chat_id: int, mode: int):
 
 async def is_autoend() -> bool:
     chat_id = 1234
-    user = await autoenddb.find_one({"chat_id": chat_id})
-    if not user:
-        return False
-    return True
+    mode = autoend.get(chat_id)
+    if mode is None:
+        mode = bool(await autoenddb.find_one({"chat_id": chat_id}))
+        autoend[chat_id] = mode
+    return mode
 
 
 async def autoend_on():
     chat_id = 1234
+    autoend[chat_id] = True
     await autoenddb.insert_one({"chat_id": chat_id})
 
 
 async def autoend_off():
     chat_id = 1234
+    autoend[chat_id] = False
     await autoenddb.delete_one({"chat_id": chat_id})
 
 
@@ -8,13 +8,15 @@
 # All rights reserved.
 
 import asyncio
+import time
 
 from pyrogram.enums import ChatMemberStatus
-from pyrogram.errors import (ChatAdminRequired, InviteRequestSent,
+from pyrogram.errors import (ChatAdminRequired, FloodWait, InviteRequestSent,
                              UserAlreadyParticipant, UserNotParticipant)
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from AloneMusic import YouTube, app
+from AloneMusic.core.placement import placement
 from AloneMusic.misc import SUDOERS
 from AloneMusic.utils.database import (get_assistant, get_cmode, get_lang,
                                        get_playmode, get_playtype,
@@ -28,6 +30,7 @@ links = {}
 
 def PlayWrapper(command):
     async def wrapper(client, message):
+        started = time.monotonic()
         language = await get_lang(message.chat.id)
         _ = get_string(language)
         if message.sender_chat:
@@ -167,6 +170,11 @@ def PlayWrapper(command):
                     await myu.edit(_["call_5"].format(app.mention))
                 except UserAlreadyParticipant:
                     pass
+                except FloodWait as e:
+                    placement.penalize_chat(chat_id, e.value)
+                    return await message.reply_text(
+                        _["call_3"].format(app.mention, type(e).__name__)
+                    )
                 except Exception as e:
                     return await message.reply_text(
                         _["call_3"].format(app.mention, type(e).__name__)
@@ -189,6 +197,7 @@ def PlayWrapper(command):
             playmode,
             url,
             fplay,
+            started,
         )
 
     return wrapper
@@ -0,0 +1,408 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Union
+
+import aiohttp
+
+from AloneMusic.core.http import STREAM_TIMEOUT
+from AloneMusic.logger import LOGGER
+
+CONNECTIONS = 4
+MIN_SEGMENT_SIZE = 4 * 1024 * 1024
+# bytes that must be on disk before a growing file is handed to the call
+PROGRESSIVE_PREBUFFER = 512 * 1024
+READ_SIZE = 256 * 1024
+BUFFER_SIZE = 1024 * 1024
+RETRIES = 6
+
+
+class RateLimiter:
+    """Token bucket shared by every download started under it."""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def consume(self, nbytes: int) -> None:
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                float(self.rate), self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= nbytes
+            if self.tokens < 0:
+                await asyncio.sleep(-self.tokens / self.rate)
+
+
+# set by background work (the prefetcher) so its downloads share one budget
+throttle: ContextVar[Union[RateLimiter, None]] = ContextVar("throttle", default=None)
+
+
+class Download:
+    def __init__(self, dest: str, size: Union[int, None], segments: list, done: list):
+        self.dest = dest
+        self.part = dest + ".part"
+        self.size = size
+        self.segments = segments
+        self.done = done
+        self.started = time.monotonic()
+        self.resumed = sum(done)
+        self.finished = False
+        self.limiter = throttle.get()
+        # set and replaced whenever more of the file lands, or it ends
+        self._progress = asyncio.Event()
+
+    @property
+    def written(self) -> int:
+        return sum(self.done)
+
+    @property
+    def contiguous(self) -> int:
+        """Bytes available from the start of the file without gaps."""
+        total = 0
+        for (start, end), done in zip(self.segments, self.done):
+            total += done
+            if start + done <= end:
+                break
+        return total
+
+    def notify(self) -> None:
+        self._progress.set()
+        self._progress = asyncio.Event()
+
+    async def progressed(self) -> None:
+        """Wait until more of the file is on disk, or the download ended."""
+        await self._progress.wait()
+
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return (self.written - self.resumed) / elapsed if elapsed > 0 else 0.0
+
+    def state(self) -> dict:
+        return {"size": self.size, "segments": self.segments, "done": self.done}
+
+
+class RangedDownloader:
+    """
+    HTTP downloader that splits large files into parallel Range requests.
+
+    Segments are buffered in memory and written with ``os.pwrite`` on the
+    default executor, so the event loop never blocks on disk. Progress is kept
+    in a ``.part.json`` sidecar and a retry, or a restart, continues from the
+    bytes already on disk instead of from zero.
+    """
+
+    def __init__(self):
+        self.active: dict[str, Download] = {}
+        self.history = deque(maxlen=50)
+        self.urgent: set[str] = set()
+        # set and replaced whenever a download starts
+        self._started = asyncio.Event()
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str):
+        async with session.get(
+            url, headers={"Range": "bytes=0-0"}, timeout=STREAM_TIMEOUT
+        ) as resp:
+            if resp.status == 206:
+                total = resp.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+                return (int(total), True) if total.isdigit() else (None, False)
+            if resp.status == 200:
+                return resp.content_length, False
+            raise Exception(f"status {resp.status}")
+
+    @staticmethod
+    def _plan(size: int) -> list:
+        count = max(1, min(CONNECTIONS, size // MIN_SEGMENT_SIZE))
+        step = size // count
+        segments = []
+        for i in range(count):
+            start = i * step
+            end = size - 1 if i == count - 1 else start + step - 1
+            segments.append([start, end])
+        return segments
+
+    @staticmethod
+    def _load_state(dest: str, size: int, sequential: bool) -> Union[dict, None]:
+        try:
+            with open(dest + ".part.json") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("size") != size or not os.path.isfile(dest + ".part"):
+            return None
+        if sequential and len(state["segments"]) > 1:
+            return None
+        if os.path.getsize(dest + ".part") < sum(state["done"]):
+            return None
+        return state
+
+    @staticmethod
+    def _write_state(path: str, state: dict) -> None:
+        with open(path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    async def _save(self, dl: Download, lock: asyncio.Lock) -> None:
+        loop = asyncio.get_running_loop()
+        async with lock:
+            await loop.run_in_executor(
+                None, self._write_state, dl.dest + ".part.json", dl.state()
+            )
+
+    @staticmethod
+    async def _pwrite(fd: int, data: bytes, offset: int) -> None:
+        # a cancelled segment still waits for its write, so nothing touches
+        # the descriptor once it is closed
+        write = asyncio.get_running_loop().run_in_executor(
+            None, os.pwrite, fd, data, offset
+        )
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            await write
+            raise
+
+    async def _segment(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        fd: int,
+        dl: Download,
+        index: int,
+        lock: asyncio.Lock,
+        flush: int = BUFFER_SIZE,
+    ) -> None:
+        start, end = dl.segments[index]
+        backoff = 1
+        for attempt in range(RETRIES):
+            offset = start + dl.done[index]
+            if offset > end:
+                return
+            try:
+                async with session.get(
+                    url,
+                    headers={"Range": f"bytes={offset}-{end}"},
+                    timeout=STREAM_TIMEOUT,
+                ) as resp:
+                    if resp.status != 206:
+                        raise Exception(f"status {resp.status}")
+                    buf = bytearray()
+                    async for chunk in resp.content.iter_chunked(READ_SIZE):
+                        await self._throttle(dl, len(chunk))
+                        buf += chunk
+                        if len(buf) < flush:
+                            continue
+                        await self._pwrite(fd, bytes(buf), offset)
+                        offset += len(buf)
+                        dl.done[index] += len(buf)
+                        dl.notify()
+                        buf = bytearray()
+                        await self._save(dl, lock)
+                    if buf:
+                        await self._pwrite(fd, bytes(buf), offset)
+                        dl.done[index] += len(buf)
+                        dl.notify()
+                        await self._save(dl, lock)
+                if start + dl.done[index] > end:
+                    return
+                raise Exception("connection closed early")
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 16)
+
+    async def _throttle(self, dl: Download, nbytes: int) -> None:
+        if dl.limiter and dl.dest not in self.urgent:
+            await dl.limiter.consume(nbytes)
+
+    async def _ranged(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        dest: str,
+        size: int,
+        sequential: bool,
+    ) -> Download:
+        state = self._load_state(dest, size, sequential)
+        if state:
+            dl = Download(dest, size, state["segments"], state["done"])
+        else:
+            segments = [[0, size - 1]] if sequential else self._plan(size)
+            dl = Download(dest, size, segments, [0] * len(segments))
+        self._register(dl)
+        lock = asyncio.Lock()
+        fd = os.open(dl.part, os.O_RDWR | os.O_CREAT)
+        tasks = []
+        try:
+            if not state:
+                # a sequential file must only ever grow, so readers following
+                # it never run into preallocated zeros
+                os.ftruncate(fd, 0 if sequential else size)
+                await self._save(dl, lock)
+            # a followed file is flushed more often so playback can start early
+            flush = READ_SIZE if sequential else BUFFER_SIZE
+            tasks = [
+                asyncio.create_task(self._segment(session, url, fd, dl, i, lock, flush))
+                for i in range(len(dl.segments))
+            ]
+            await asyncio.gather(*tasks)
+        finally:
+            # one failed segment must not leave the others writing to fd
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            os.close(fd)
+        return dl
+
+    async def _single(
+        self, session: aiohttp.ClientSession, url: str, dest: str, size
+    ) -> Download:
+        # the server ignores Range, so all we can do is stream from zero
+        loop = asyncio.get_running_loop()
+        dl = Download(dest, size, [[0, (size or 0) - 1]], [0])
+        self._register(dl)
+        backoff = 1
+        for attempt in range(RETRIES):
+            dl.done[0] = 0
+            try:
+                async with session.get(url, timeout=STREAM_TIMEOUT) as resp:
+                    if resp.status != 200:
+                        raise Exception(f"status {resp.status}")
+                    f = await loop.run_in_executor(None, open, dl.part, "wb")
+                    try:
+                        buf = bytearray()
+                        async for chunk in resp.content.iter_chunked(READ_SIZE):
+                            await self._throttle(dl, len(chunk))
+                            buf += chunk
+                            if len(buf) >= BUFFER_SIZE:
+                                await loop.run_in_executor(None, f.write, bytes(buf))
+                                dl.done[0] += len(buf)
+                                dl.notify()
+                                buf = bytearray()
+                        if buf:
+                            await loop.run_in_executor(None, f.write, bytes(buf))
+                            dl.done[0] += len(buf)
+                            dl.notify()
+                    finally:
+                        await loop.run_in_executor(None, f.close)
+                return dl
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 16)
+
+    async def fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        dest: str,
+        sequential: bool = False,
+    ) -> bool:
+        dest = os.path.abspath(dest)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        dl = None
+        try:
+            backoff = 1
+            for attempt in range(RETRIES):
+                try:
+                    size, ranges = await self._probe(session, url)
+                    break
+                except Exception:
+                    if attempt == RETRIES - 1:
+                        raise
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 16)
+            if ranges and size:
+                dl = await self._ranged(session, url, dest, size, sequential)
+            else:
+                dl = await self._single(session, url, dest, size)
+            os.replace(dl.part, dest)
+            dl.finished = True
+            try:
+                os.remove(dest + ".part.json")
+            except OSError:
+                pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Download failed for {dest}: {e}")
+            return False
+        finally:
+            ended = self.active.pop(dest, None)
+            if ended:
+                ended.notify()
+            self.urgent.discard(dest)
+        self._report(dl)
+        return True
+
+    def _register(self, dl: Download) -> None:
+        self.active[dl.dest] = dl
+        self._started.set()
+        self._started = asyncio.Event()
+
+    async def started(self) -> None:
+        """Wait until some download starts."""
+        await self._started.wait()
+
+    def progress(self, dest: str) -> Union[Download, None]:
+        if not isinstance(dest, str):
+            return None
+        return self.active.get(os.path.abspath(dest))
+
+    def promote(self, dest: str) -> None:
+        """Lift the background budget off ``dest``, something is waiting on it."""
+        self.urgent.add(os.path.abspath(dest))
+
+    async def wait_for(self, dest: str, nbytes: int = None) -> bool:
+        """
+        Wait until ``nbytes`` from the start of ``dest`` are on disk, or until
+        the download is complete when ``nbytes`` is None.
+        """
+        while True:
+            dl = self.progress(dest)
+            if dl is None:
+                return os.path.exists(dest)
+            if nbytes is not None and dl.contiguous >= min(nbytes, dl.size or nbytes):
+                return True
+            await dl.progressed()
+
+    def _report(self, dl: Download) -> None:
+        elapsed = time.monotonic() - dl.started
+        rate = dl.throughput()
+        self.history.append(
+            {
+                "file": os.path.basename(dl.dest),
+                "size": dl.written,
+                "seconds": round(elapsed, 2),
+                "rate": rate,
+                "connections": len(dl.segments),
+                "resumed": dl.resumed,
+            }
+        )
+        LOGGER(__name__).info(
+            f"Downloaded {os.path.basename(dl.dest)}: "
+            f"{dl.written / 1048576:.1f} MB in {elapsed:.1f}s "
+            f"({rate / 1048576:.2f} MB/s, {len(dl.segments)} connections"
+            + (f", resumed at {dl.resumed / 1048576:.1f} MB)" if dl.resumed else ")")
+        )
+
+
+downloader = RangedDownloader()
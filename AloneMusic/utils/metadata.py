@@ -0,0 +1,270 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Union
+
+from py_yt import VideosSearch
+
+import config
+from AloneMusic.core.mongo import mongodb
+from AloneMusic.logger import LOGGER
+
+META_CACHE_SIZE = 512
+META_CACHE_TTL = 60 * 60
+# flat listings of a few playlists queued close together, each up to
+# PLAYLIST_LAZY_LIMIT entries
+FLAT_CACHE_SIZE = 4 * config.PLAYLIST_LAZY_LIMIT
+# result pages of text searches, kept in memory and in mongo
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 12 * 60 * 60
+SEARCH_PAGE = 10
+
+searchdb = mongodb.searchcache
+
+_VIDEO_ID = re.compile(r"^[0-9A-Za-z_-]{11}$")
+_VIDEO_LINK = re.compile(
+    r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([0-9A-Za-z_-]{11})"
+)
+
+
+def extract_video_id(link: str) -> Union[str, None]:
+    if _VIDEO_ID.match(link):
+        return link
+    match = _VIDEO_LINK.search(link)
+    return match.group(1) if match else None
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def thumb_url(result: dict) -> str:
+    return result["thumbnails"][0]["url"].split("?")[0]
+
+
+class VideoMetaCache:
+    """
+    Single source of YouTube search metadata, keyed by video id.
+
+    Results live in a bounded LRU with a TTL, and concurrent lookups for the
+    same key share one in-flight ``VideosSearch`` instead of scraping again.
+    Title and duration seen in flat playlist listings are kept on the side,
+    they are enough to queue a track without searching for it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = META_CACHE_SIZE,
+        ttl: int = META_CACHE_TTL,
+        flat_maxsize: int = FLAT_CACHE_SIZE,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.flat_maxsize = flat_maxsize
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self._flat: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(link: str) -> str:
+        vidid = extract_video_id(link)
+        if vidid:
+            return vidid
+        return "q:" + normalize_query(link)
+
+    def _lookup(self, key: str) -> Union[dict, None]:
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _store(self, key: str, result: dict) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def put(self, result: dict) -> None:
+        vidid = result.get("id")
+        if vidid:
+            self._store(vidid, result)
+
+    def put_flat(self, vidid: str, title: str, seconds: int) -> None:
+        self._flat[vidid] = (time.monotonic() + self.ttl, title, seconds)
+        self._flat.move_to_end(vidid)
+        while len(self._flat) > self.flat_maxsize:
+            self._flat.popitem(last=False)
+
+    def flat(self, vidid: str) -> Union[tuple, None]:
+        entry = self._flat.get(vidid)
+        if not entry or entry[0] < time.monotonic():
+            return None
+        return entry[1], entry[2]
+
+    def invalidate(self, link: str) -> None:
+        self._cache.pop(self._key(link), None)
+
+    async def _search(self, key: str, link: str) -> dict:
+        if key.startswith("q:"):
+            # the first hit of the page /play's slider will show anyway
+            results = await search_cache.page(link)
+        else:
+            # a bare id searched as text matches whatever mentions it
+            url = f"https://www.youtube.com/watch?v={key}"
+            results = (await VideosSearch(url, limit=1).next())["result"]
+        if not results:
+            raise LookupError(f"No results found for {link}")
+        result = results[0]
+        # stored under its own id, and under another key only for a query
+        self.put(result)
+        if key.startswith("q:"):
+            self._store(key, result)
+        return result
+
+    async def get(self, link: str) -> dict:
+        key = self._key(link)
+        result = self._lookup(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(key, link))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # a cancelled waiter must not cancel the lookup shared with the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SearchCache:
+    """
+    Result pages of text searches, keyed by the normalized query.
+
+    A page is ``SEARCH_PAGE`` results, what the /play slider steps through,
+    so paging never searches again. Pages live in an LRU and in the
+    ``searchcache`` collection, whose TTL index drops them after
+    ``SEARCH_CACHE_TTL``, so popular queries survive a restart.
+    """
+
+    def __init__(self, maxsize: int = SEARCH_CACHE_SIZE, ttl: int = SEARCH_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.stored = 0
+        self.misses = 0
+
+    async def start(self) -> None:
+        try:
+            await searchdb.create_index("at", expireAfterSeconds=self.ttl)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unable to index the search cache: {e}")
+
+    def _lookup(self, key: str) -> Union[list, None]:
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+        expires, results = entry
+        if expires < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return results
+
+    def _store(self, key: str, results: list, age: float = 0) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl - age, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        for result in results:
+            video_meta.put(result)
+
+    async def _load(self, key: str) -> Union[list, None]:
+        try:
+            doc = await searchdb.find_one({"_id": key})
+        except Exception:
+            return None
+        if not doc:
+            return None
+        # mongo only sweeps expired documents once a minute
+        age = (datetime.utcnow() - doc["at"]).total_seconds()
+        if age >= self.ttl:
+            return None
+        self._store(key, doc["results"], age)
+        return doc["results"]
+
+    async def _save(self, key: str, results: list) -> None:
+        try:
+            await searchdb.update_one(
+                {"_id": key},
+                {"$set": {"results": results, "at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Unable to store search results: {e}")
+
+    async def _search(self, key: str, query: str) -> list:
+        results = await self._load(key)
+        if results:
+            self.stored += 1
+            return results
+        self.misses += 1
+        results = (await VideosSearch(query, limit=SEARCH_PAGE).next())["result"]
+        if not results:
+            raise LookupError(f"No results found for {query}")
+        self._store(key, results)
+        await self._save(key, results)
+        return results
+
+    async def page(self, query: str) -> list:
+        key = normalize_query(query)
+        results = self._lookup(key)
+        if results is not None:
+            self.hits += 1
+            return results
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(key, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "stored": self.stored,
+            "misses": self.misses,
+        }
+
+
+video_meta = VideoMetaCache()
+search_cache = SearchCache()
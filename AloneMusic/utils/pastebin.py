@@ -7,19 +7,18 @@
 #
 # All rights reserved.
 
-import aiohttp
+from AloneMusic.core.http import http
 
 BASE = "https://batbin.me/"
 
 
 async def post(url: str, *args, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, *args, **kwargs) as resp:
-            try:
-                data = await resp.json()
-            except Exception:
-                data = await resp.text()
-        return data
+    async with http.session.post(url, *args, **kwargs) as resp:
+        try:
+            data = await resp.json()
+        except Exception:
+            data = await resp.text()
+    return data
 
 
 async def AloneBin(text):
@@ -7,21 +7,13 @@
 #
 # All rights reserved.
 
-import os
-
-from config import autoclean
+from AloneMusic.utils.stream.cache import media_cache
+from AloneMusic.utils.stream.prefetch import prefetcher
 
 
 async def auto_clean(popped):
     try:
-        rem = popped["file"]
-        autoclean.remove(rem)
-        count = autoclean.count(rem)
-        if count == 0:
-            if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
-                try:
-                    os.remove(rem)
-                except:
-                    pass
+        media_cache.release(popped["file"])
     except:
         pass
+    prefetcher.wake()
@@ -0,0 +1,253 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Union
+
+import config
+from AloneMusic.logger import LOGGER
+
+DOWNLOAD_FOLDER = "downloads"
+INDEX_FILE = os.path.join(DOWNLOAD_FOLDER, ".index.json")
+INDEX_FLUSH_DELAY = 5
+VIDEO_EXTS = {"mp4", "mkv", "mov", "avi", "flv", "3gp", "m4v"}
+
+
+def media_kind(path: str) -> str:
+    ext = path.rsplit(".", 1)[-1].lower()
+    return "video" if ext in VIDEO_EXTS else "audio"
+
+
+class MediaCache:
+    """
+    On-disk media cache for ``downloads/`` keyed by track id and kind.
+
+    Queue entries hold a reference on the file they will play, and only files
+    with no live references are evicted, least recently used first, once the
+    folder grows past ``config.DOWNLOADS_CACHE_LIMIT``. The index is written
+    to ``downloads/.index.json`` so hot tracks survive a restart.
+    """
+
+    def __init__(self, limit: int = config.DOWNLOADS_CACHE_LIMIT):
+        self.limit = limit
+        self.entries: dict[str, dict] = {}
+        self.paths: dict[str, str] = {}
+        self.refs: dict[str, int] = {}
+        self.size = 0
+        self._flush_handle = None
+
+    @staticmethod
+    def _key(track_id: str, kind: str) -> str:
+        return f"{track_id}:{kind}"
+
+    @staticmethod
+    def _norm(path: str) -> str:
+        return os.path.abspath(path)
+
+    def _is_media(self, path: str) -> bool:
+        folder = os.path.abspath(DOWNLOAD_FOLDER) + os.sep
+        # a file still being downloaded can be pinned before it is added
+        return path.startswith(folder) and (
+            os.path.isfile(path) or os.path.isfile(path + ".part")
+        )
+
+    def load(self) -> None:
+        os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
+        try:
+            with open(INDEX_FILE) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        for key, entry in stored.items():
+            path = self._norm(entry["path"])
+            if os.path.isfile(path):
+                self._insert(key, path, entry.get("atime", 0))
+        # adopt files written before the index existed or by other tools
+        for name in os.listdir(DOWNLOAD_FOLDER):
+            path = self._norm(os.path.join(DOWNLOAD_FOLDER, name))
+            if name.startswith(".") or path in self.paths or not os.path.isfile(path):
+                continue
+            if name.endswith((".part", ".part.json", ".tmp", ".ytdl")):
+                continue
+            track_id = name.rsplit(".", 1)[0]
+            self._insert(
+                self._key(track_id, media_kind(name)), path, os.path.getmtime(path)
+            )
+        self._evict()
+        self._save()
+        LOGGER(__name__).info(
+            f"Media Cache Loaded: {len(self.entries)} files, {self.size // 1048576} MB."
+        )
+
+    def _insert(self, key: str, path: str, atime: float) -> None:
+        old = self.entries.get(key)
+        if old:
+            self.size -= old["size"]
+            self.paths.pop(old["path"], None)
+        size = os.path.getsize(path)
+        self.entries[key] = {"path": path, "size": size, "atime": atime}
+        self.paths[path] = key
+        self.size += size
+
+    def _remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if not entry:
+            return
+        self.size -= entry["size"]
+        self.paths.pop(entry["path"], None)
+        try:
+            os.remove(entry["path"])
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        if self.size <= self.limit:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda x: x[1]["atime"]):
+            if self.size <= self.limit:
+                break
+            if self.refs.get(entry["path"]):
+                continue
+            self._remove(key)
+
+    def _save(self) -> None:
+        self._flush_handle = None
+        tmp = INDEX_FILE + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, INDEX_FILE)
+        except OSError as e:
+            LOGGER(__name__).warning(f"Unable to write media cache index: {e}")
+
+    def _mark_dirty(self) -> None:
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._save()
+        self._flush_handle = loop.call_later(INDEX_FLUSH_DELAY, self._save)
+
+    def lookup(self, track_id: str, kind: str = "audio") -> Union[str, None]:
+        key = self._key(track_id, kind)
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if not os.path.isfile(entry["path"]):
+            self._remove(key)
+            self._mark_dirty()
+            return None
+        entry["atime"] = time.time()
+        self._mark_dirty()
+        return entry["path"]
+
+    def add(
+        self, path: str, track_id: str = None, kind: str = None
+    ) -> Union[str, None]:
+        path = self._norm(path)
+        if not os.path.isfile(path):
+            return None
+        name = os.path.basename(path)
+        track_id = track_id or name.rsplit(".", 1)[0]
+        self._insert(self._key(track_id, kind or media_kind(name)), path, time.time())
+        self._evict()
+        self._mark_dirty()
+        return path
+
+    def acquire(self, path: str) -> None:
+        if not isinstance(path, str):
+            return
+        path = self._norm(path)
+        if path not in self.paths and not self._is_media(path):
+            return
+        # pin before adopting so the file can't be evicted by its own insert
+        self.refs[path] = self.refs.get(path, 0) + 1
+        key = self.paths.get(path)
+        if key:
+            self.entries[key]["atime"] = time.time()
+        else:
+            self.add(path)
+
+    def release(self, path: str) -> None:
+        if not isinstance(path, str):
+            return
+        path = self._norm(path)
+        if path not in self.refs:
+            return
+        count = self.refs[path] - 1
+        if count > 0:
+            self.refs[path] = count
+            return
+        self.refs.pop(path, None)
+        self._evict()
+        self._mark_dirty()
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._save()
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.entries),
+            "size": self.size,
+            "limit": self.limit,
+            "pinned": len(self.refs),
+        }
+
+
+class InflightDownloads:
+    """
+    Process-wide registry of running downloads.
+
+    The first requester for a key starts the download as its own task and
+    every later requester awaits that same task. Waiters are shielded, so a
+    cancelled /play never cancels a download other chats are waiting on; only
+    when the last waiter is cancelled is the download itself cancelled.
+    """
+
+    def __init__(self):
+        self.tasks: dict[str, asyncio.Task] = {}
+        self.waiters: dict[str, int] = {}
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self.tasks.get(key) is task:
+            self.tasks.pop(key)
+        # retrieve the error even if every waiter has gone away meanwhile
+        if not task.cancelled():
+            task.exception()
+
+    async def run(self, key: str, factory: Callable[[], Awaitable]):
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self.tasks[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        self.waiters[key] = self.waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.waiters[key] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self.waiters[key] -= 1
+            if not self.waiters[key]:
+                self.waiters.pop(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.tasks
+
+
+media_cache = MediaCache()
+inflight = InflightDownloads()
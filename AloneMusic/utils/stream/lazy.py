@@ -0,0 +1,90 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+
+import config
+from AloneMusic import YouTube
+from AloneMusic.logger import LOGGER
+from AloneMusic.misc import db
+
+# unresolved entries this close to the head are resolved, the head included
+LAZY_AHEAD = 3
+
+# id(entry) -> the task resolving it, so the prefetcher and Call.play share one
+_resolving: dict[int, asyncio.Task] = {}
+
+
+def is_lazy(entry: dict) -> bool:
+    return entry.get("file") == "lazy"
+
+
+async def _resolve(entry: dict) -> bool:
+    ref, videoid = entry["lazy"]
+    try:
+        title, duration_min, duration_sec, _, vidid = await YouTube.details(
+            ref, videoid
+        )
+    except Exception as e:
+        LOGGER(__name__).warning(f"Could not resolve queued track {ref}: {e}")
+        return False
+    if str(duration_min) == "None" or duration_sec > config.DURATION_LIMIT:
+        return False
+    entry.update(
+        {
+            "title": title.title(),
+            "dur": duration_min,
+            "vidid": vidid,
+            "file": f"vid_{vidid}",
+            "seconds": max(duration_sec - 3, 0),
+        }
+    )
+    entry.pop("lazy", None)
+    return True
+
+
+async def resolve_entry(entry: dict) -> bool:
+    if not is_lazy(entry):
+        return True
+    key = id(entry)
+    task = _resolving.get(key)
+    if task is None:
+        task = asyncio.create_task(_resolve(entry))
+        _resolving[key] = task
+        task.add_done_callback(lambda _: _resolving.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def resolve_ahead(chat_id: int, ahead: int = LAZY_AHEAD) -> None:
+    """
+    Resolve the unresolved entries among the first ``ahead + 1`` of a queue,
+    dropping the ones that cannot be played, until that window is all real
+    tracks or the queue runs out.
+    """
+    while True:
+        queue = db.get(chat_id)
+        if not queue:
+            return
+        pending = [e for e in queue[: ahead + 1] if is_lazy(e)]
+        if not pending:
+            return
+        results = await asyncio.gather(*(resolve_entry(e) for e in pending))
+        for entry, ok in zip(pending, results):
+            if not ok:
+                # the queue may have been cleared or reordered meanwhile
+                for i, queued in enumerate(db.get(chat_id) or []):
+                    if queued is entry:
+                        del db[chat_id][i]
+                        break
+
+
+async def resolve_head(chat_id: int) -> bool:
+    """Make sure the head of the queue is playable; False if nothing is left."""
+    await resolve_ahead(chat_id, 0)
+    return bool(db.get(chat_id))
@@ -0,0 +1,65 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+PLAYLIST_CONCURRENCY = 6
+
+
+async def expand(
+    items: Iterable,
+    resolve: Callable[[object], Awaitable],
+    limit: int,
+    concurrency: int = PLAYLIST_CONCURRENCY,
+    rest: list = None,
+) -> AsyncIterator:
+    """
+    Resolve playlist items with up to ``concurrency`` lookups in flight and
+    yield the results in the original order, as soon as each one and all
+    before it are done. ``resolve`` returns None (or raises) for an item that
+    should be skipped, and more items are taken in its place; at most
+    ``limit`` results are yielded and lookups still running after that are
+    cancelled. Their items go to ``rest`` in order, followed by the items
+    never taken.
+    """
+    items = iter(items)
+    pending = deque()
+
+    def fill() -> None:
+        while len(pending) < concurrency:
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            pending.append((item, asyncio.ensure_future(resolve(item))))
+
+    accepted = 0
+    fill()
+    try:
+        while pending and accepted < limit:
+            _, task = pending.popleft()
+            try:
+                result = await task
+            except Exception:
+                result = None
+            fill()
+            if result is None:
+                continue
+            accepted += 1
+            yield result
+    finally:
+        for _, task in pending:
+            if task.done() and not task.cancelled():
+                task.exception()
+            task.cancel()
+        if rest is not None:
+            rest.extend(item for item, _ in pending)
+            rest.extend(items)
@@ -0,0 +1,69 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import time
+
+from AloneMusic.misc import db
+
+
+class PlaybackClock:
+    """
+    Where each chat is in its current track, in seconds on the listener's
+    timeline.
+
+    Nothing ticks: every chat keeps the offset it had when it last started,
+    resumed or seeked and the monotonic time it has been playing since (None
+    while paused), and the position is worked out when it is read. So it
+    costs nothing per second and does not drift when the event loop is busy.
+    """
+
+    def __init__(self):
+        self.offset: dict[int, float] = {}
+        self.since: dict[int, float] = {}
+
+    def start(self, chat_id: int, offset: float = 0) -> None:
+        """The chat's track (re)started playing at ``offset``."""
+        self.offset[chat_id] = offset
+        self.since[chat_id] = time.monotonic()
+
+    def seek(self, chat_id: int, offset: float) -> None:
+        """Moves to ``offset`` without changing whether the chat is paused."""
+        self.offset[chat_id] = offset
+        if self.since.get(chat_id) is not None:
+            self.since[chat_id] = time.monotonic()
+
+    def pause(self, chat_id: int) -> None:
+        since = self.since.get(chat_id)
+        if since is None:
+            return
+        self.offset[chat_id] = self.offset.get(chat_id, 0) + time.monotonic() - since
+        self.since[chat_id] = None
+
+    def resume(self, chat_id: int) -> None:
+        if chat_id in self.offset and self.since.get(chat_id) is None:
+            self.since[chat_id] = time.monotonic()
+
+    def stop(self, chat_id: int) -> None:
+        self.offset.pop(chat_id, None)
+        self.since.pop(chat_id, None)
+
+    def played(self, chat_id: int) -> int:
+        """Seconds played of the chat's current track, capped at its length."""
+        played = self.offset.get(chat_id, 0)
+        since = self.since.get(chat_id)
+        if since is not None:
+            played += time.monotonic() - since
+        queue = db.get(chat_id)
+        duration = int(queue[0]["seconds"]) if queue else 0
+        if duration:
+            played = min(played, duration)
+        return int(played)
+
+
+positions = PlaybackClock()
@@ -0,0 +1,166 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+from typing import Union
+
+import config
+from AloneMusic import YouTube
+from AloneMusic.logger import LOGGER
+from AloneMusic.misc import db
+from AloneMusic.utils.downloader import RateLimiter, throttle
+from AloneMusic.utils.stream.cache import media_cache
+from AloneMusic.utils.stream.lazy import LAZY_AHEAD, is_lazy, resolve_ahead
+
+PREFETCH_INTERVAL = 5
+
+
+class Prefetcher:
+    """
+    Downloads the next ``config.PREFETCH_AHEAD`` ``vid_`` entries of every
+    queue in the background, so ``Call.play`` finds them already on disk.
+
+    The wanted set is rebuilt from ``db`` whenever a queue changes (and every
+    few seconds anyway), so skips, shuffles and removals simply cancel the
+    downloads that fell out of it. All prefetches share one concurrency limit
+    and one bandwidth budget; a track that /play or ``Call.play`` starts
+    waiting on is taken off the budget by the downloader. Unresolved
+    playlist entries are resolved once they are ``LAZY_AHEAD`` from the head.
+    """
+
+    def __init__(
+        self,
+        ahead: int = config.PREFETCH_AHEAD,
+        concurrency: int = config.PREFETCH_CONCURRENCY,
+        rate: int = config.PREFETCH_RATE,
+    ):
+        self.ahead = ahead
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = RateLimiter(rate)
+        self.tasks: dict[tuple, asyncio.Task] = {}
+        self.resolving: dict[int, asyncio.Task] = {}
+        self.done = 0
+        self._event = asyncio.Event()
+        self._runner: Union[asyncio.Task, None] = None
+
+    @staticmethod
+    def _kind(entry: dict) -> str:
+        return "video" if str(entry.get("streamtype")) == "video" else "audio"
+
+    def _wanted(self) -> set:
+        wanted = set()
+        for queue in list(db.values()):
+            # a head still on its placeholder is the track Call.play is
+            # waiting on, its download is handed over, not cancelled
+            for entry in queue[: 1 + self.ahead]:
+                file = entry.get("file")
+                if isinstance(file, str) and file.startswith("vid_"):
+                    wanted.add((entry["vidid"], self._kind(entry)))
+        return wanted
+
+    def _swap(self, vidid: str, kind: str, path: str) -> None:
+        for queue in list(db.values()):
+            for entry in queue:
+                if entry.get("file") == f"vid_{vidid}" and self._kind(entry) == kind:
+                    entry["file"] = path
+                    media_cache.acquire(path)
+
+    async def _fetch(self, vidid: str, kind: str) -> None:
+        async with self.semaphore:
+            throttle.set(self.limiter)
+            try:
+                path, direct = await YouTube.download(
+                    vidid, None, videoid=True, video=kind == "video" or None
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER(__name__).warning(f"Prefetch of {vidid} failed: {e}")
+                return
+        # a stream url expires, so only local files replace the placeholder
+        if path and direct:
+            self._swap(vidid, kind, path)
+            self.done += 1
+
+    def _resolve_lazy(self) -> None:
+        for chat_id, queue in list(db.items()):
+            if chat_id in self.resolving:
+                continue
+            if any(is_lazy(e) for e in queue[: LAZY_AHEAD + 1]):
+                task = asyncio.create_task(resolve_ahead(chat_id))
+                task.add_done_callback(lambda t, c=chat_id: self._resolved(c, t))
+                self.resolving[chat_id] = task
+
+    def _resolved(self, chat_id: int, task: asyncio.Task) -> None:
+        self.resolving.pop(chat_id, None)
+        if task.cancelled():
+            return
+        if task.exception():
+            LOGGER(__name__).warning(
+                f"Resolving the queue of {chat_id} failed: {task.exception()}"
+            )
+            return
+        # the resolved entries can be prefetched now
+        self.wake()
+
+    def reconcile(self) -> None:
+        self._resolve_lazy()
+        wanted = self._wanted()
+        for key, task in list(self.tasks.items()):
+            if key not in wanted:
+                task.cancel()
+                self.tasks.pop(key)
+        for key in wanted:
+            if key not in self.tasks:
+                task = asyncio.create_task(self._fetch(*key))
+                task.add_done_callback(lambda t, k=key: self._finished(k, t))
+                self.tasks[key] = task
+
+    def _finished(self, key: tuple, task: asyncio.Task) -> None:
+        if self.tasks.get(key) is task:
+            self.tasks.pop(key)
+
+    def wake(self) -> None:
+        self._event.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._event.wait(), PREFETCH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._event.clear()
+            try:
+                self.reconcile()
+            except Exception as e:
+                LOGGER(__name__).warning(f"Prefetch reconcile failed: {e}")
+
+    def start(self) -> None:
+        if self.ahead > 0 and self._runner is None:
+            self._runner = asyncio.create_task(self._run())
+            LOGGER(__name__).info("Queue Prefetcher Started.")
+
+    def stop(self) -> None:
+        if self._runner:
+            self._runner.cancel()
+            self._runner = None
+        for task in [*self.tasks.values(), *self.resolving.values()]:
+            task.cancel()
+        self.tasks.clear()
+        self.resolving.clear()
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self.tasks),
+            "done": self.done,
+            "resolving": len(self.resolving),
+        }
+
+
+prefetcher = Prefetcher()
@@ -12,7 +12,9 @@ from typing import Union
 
 from AloneMusic.misc import db
 from AloneMusic.utils.formatters import check_duration, seconds_to_min
-from config import autoclean, time_to_seconds
+from AloneMusic.utils.stream.cache import media_cache
+from AloneMusic.utils.stream.prefetch import prefetcher
+from config import time_to_seconds
 
 
 async def put_queue(
@@ -42,7 +44,6 @@ async def put_queue(
         "file": file,
         "vidid": vidid,
         "seconds": duration_in_seconds,
-        "played": 0,
     }
     if forceplay:
         check = db.get(chat_id)
@@ -53,7 +54,39 @@ async def put_queue(
             db[chat_id].append(put)
     else:
         db[chat_id].append(put)
-    autoclean.append(file)
+    media_cache.acquire(file)
+    prefetcher.wake()
+
+
+async def put_queue_lazy(
+    chat_id,
+    original_chat_id,
+    ref,
+    videoid,
+    title,
+    duration,
+    user,
+    user_id,
+    stream,
+):
+    """
+    Queue a playlist track by reference only, a video id or a search query.
+    ``resolve_ahead`` fills in the rest once it is near the head.
+    """
+    put = {
+        "title": title.title(),
+        "dur": duration or "--:--",
+        "streamtype": stream,
+        "by": user,
+        "user_id": user_id,
+        "chat_id": original_chat_id,
+        "file": "lazy",
+        "vidid": ref if videoid else None,
+        "seconds": 0,
+        "lazy": (ref, videoid),
+    }
+    db[chat_id].append(put)
+    prefetcher.wake()
 
 
 async def put_queue_index(
@@ -87,7 +120,6 @@ async def put_queue_index(
         "file": file,
         "vidid": vidid,
         "seconds": dur,
-        "played": 0,
     }
     if forceplay:
         check = db.get(chat_id)
@@ -0,0 +1,196 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import os
+import time
+from typing import Union
+
+import config
+from AloneMusic.logger import LOGGER
+from AloneMusic.misc import db
+
+PLAYBACK_FOLDER = "playback"
+MIN_SPEED = 0.25
+MAX_SPEED = 4.0
+# the range a single atempo filter accepts
+ATEMPO_MIN = 0.5
+ATEMPO_MAX = 2.0
+
+
+def parse_speed(value) -> Union[float, None]:
+    """``value`` as a playback speed, or None when it is not one we play."""
+    try:
+        speed = round(float(str(value).strip().rstrip("xX")), 2)
+    except ValueError:
+        return None
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        return None
+    return speed
+
+
+def atempo_chain(speed: float) -> str:
+    """An ffmpeg audio filter changing the tempo by ``speed`` without the pitch."""
+    factors = []
+    while speed > ATEMPO_MAX:
+        factors.append(ATEMPO_MAX)
+        speed /= ATEMPO_MAX
+    while speed < ATEMPO_MIN:
+        factors.append(ATEMPO_MIN)
+        speed /= ATEMPO_MIN
+    factors.append(speed)
+    return ",".join(f"atempo={f:.6g}" for f in factors)
+
+
+def tempo_params(speed: float, start: float, end: float) -> str:
+    """
+    ffmpeg parameters playing the source from ``start`` to ``end`` seconds at
+    ``speed``. The filter goes after the input (``-atend``), so ffmpeg applies
+    it while streaming and the change is heard as soon as the call restarts.
+    """
+    params = f"-ss {start:.2f} -to {end:.2f}"
+    if speed != 1.0:
+        params += f" -atend -filter:a {atempo_chain(speed)}"
+    return params
+
+
+class VariantCache:
+    """
+    Pre-rendered speed variants under ``playback/{speed}/``.
+
+    Audio is sped up on the fly with ``tempo_params``; only video, whose
+    frames have to be retimed as well, is rendered to a file first. Variants
+    are evicted least recently used first once the folder grows past
+    ``config.PLAYBACK_CACHE_LIMIT``, skipping the ones a queue still plays.
+    Concurrent renders of the same variant share one ffmpeg run.
+    """
+
+    def __init__(self, limit: int = config.PLAYBACK_CACHE_LIMIT):
+        self.limit = limit
+        self.entries: dict[str, dict] = {}
+        self.size = 0
+        self.rendered = 0
+        self.hits = 0
+        self._renders: dict[str, asyncio.Task] = {}
+
+    def load(self) -> None:
+        os.makedirs(PLAYBACK_FOLDER, exist_ok=True)
+        for root, _, files in os.walk(PLAYBACK_FOLDER):
+            for name in files:
+                path = os.path.abspath(os.path.join(root, name))
+                if name.startswith("."):
+                    # a render that was interrupted
+                    self._unlink(path)
+                    continue
+                self._insert(path, os.path.getmtime(path))
+        self._evict()
+        LOGGER(__name__).info(
+            f"Speed Variants Loaded: {len(self.entries)} files, {self.size // 1048576} MB."
+        )
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _insert(self, path: str, atime: float) -> None:
+        old = self.entries.pop(path, None)
+        if old:
+            self.size -= old["size"]
+        size = os.path.getsize(path)
+        self.entries[path] = {"size": size, "atime": atime}
+        self.size += size
+
+    @staticmethod
+    def _playing() -> set:
+        return {
+            os.path.abspath(entry["speed_path"])
+            for queue in list(db.values())
+            for entry in queue
+            if entry.get("speed_path")
+        }
+
+    def _evict(self) -> None:
+        if self.size <= self.limit:
+            return
+        playing = self._playing()
+        for path, entry in sorted(self.entries.items(), key=lambda x: x[1]["atime"]):
+            if self.size <= self.limit:
+                break
+            if path in playing:
+                continue
+            self.entries.pop(path)
+            self.size -= entry["size"]
+            self._unlink(path)
+
+    @staticmethod
+    def path(file_path: str, speed: float) -> str:
+        folder = os.path.join(PLAYBACK_FOLDER, f"{speed:g}")
+        return os.path.abspath(os.path.join(folder, os.path.basename(file_path)))
+
+    async def _render(self, file_path: str, speed: float, out: str) -> None:
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(out), "." + os.path.basename(out))
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-y",
+            "-i",
+            file_path,
+            "-filter:v",
+            f"setpts=PTS/{speed:g}",
+            "-filter:a",
+            atempo_chain(speed),
+            tmp,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            self._unlink(tmp)
+            raise
+        if proc.returncode != 0 or not os.path.isfile(tmp):
+            self._unlink(tmp)
+            raise RuntimeError(stderr.decode(errors="ignore")[-300:])
+        os.replace(tmp, out)
+        self.rendered += 1
+        self._insert(out, time.time())
+        self._evict()
+
+    async def render(self, file_path: str, speed: float) -> str:
+        """``file_path`` at ``speed``, rendered now unless it already is."""
+        out = self.path(file_path, speed)
+        entry = self.entries.get(out)
+        if entry and os.path.isfile(out):
+            self.hits += 1
+            entry["atime"] = time.time()
+            return out
+        task = self._renders.get(out)
+        if task is None:
+            task = asyncio.create_task(self._render(file_path, speed, out))
+            self._renders[out] = task
+            task.add_done_callback(lambda _: self._renders.pop(out, None))
+        await asyncio.shield(task)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self.entries),
+            "size": self.size,
+            "rendering": len(self._renders),
+            "rendered": self.rendered,
+            "hits": self.hits,
+        }
+
+
+variants = VariantCache()
@@ -7,22 +7,51 @@
 # All rights reserved.
 
 import os
+import time
+from collections import deque
+from contextlib import aclosing
 from random import randint
 from typing import Union
 
 from pyrogram.types import InlineKeyboardMarkup
 
 import config
-from AloneMusic import Carbon, YouTube, app
+from AloneMusic import LOGGER, Carbon, YouTube, app
 from AloneMusic.core.call import Alone
 from AloneMusic.misc import db
 from AloneMusic.utils.database import add_active_video_chat, is_active_chat
 from AloneMusic.utils.exceptions import AssistantErr
+from AloneMusic.utils.formatters import seconds_to_min, time_to_seconds
 from AloneMusic.utils.inline import aq_markup, close_markup, stream_markup
+from AloneMusic.utils.metadata import video_meta
 from AloneMusic.utils.pastebin import AloneBin
-from AloneMusic.utils.stream.queue import put_queue, put_queue_index
+from AloneMusic.utils.stream.playlist import expand
+from AloneMusic.utils.stream.queue import (put_queue, put_queue_index,
+                                           put_queue_lazy)
 from AloneMusic.utils.thumbnails import get_thumb
 
+# (streamtype, seconds) from the play command or button to the call playing
+play_latency = deque(maxlen=100)
+
+
+def _record_latency(streamtype: str, started: float) -> None:
+    elapsed = time.monotonic() - started
+    play_latency.append((streamtype, elapsed))
+    LOGGER(__name__).info(f"Playback of {streamtype} started in {elapsed:.2f}s")
+
+
+def _lazy_title(item: str, spotify) -> tuple:
+    """What a queued but unresolved playlist track shows, without a lookup."""
+    if spotify:
+        return item, None
+    flat = video_meta.flat(item)
+    if not flat:
+        return item, None
+    title, seconds = flat
+    if seconds and seconds > config.DURATION_LIMIT:
+        return None, None
+    return title, seconds_to_min(seconds) if seconds else None
+
 
 async def stream(
     _,
@@ -36,110 +65,145 @@ async def stream(
     streamtype: Union[bool, str] = None,
     spotify: Union[bool, str] = None,
     forceplay: Union[bool, str] = None,
+    started: float = None,
 ):
     if not result:
         return
+    if started is None:
+        started = time.monotonic()
     if forceplay:
         await Alone.force_stop_stream(chat_id)
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
+
+        async def resolve(search):
+            details = await YouTube.details(search, False if spotify else True)
+            duration_min, duration_sec = details[1], details[2]
             if str(duration_min) == "None":
-                continue
+                return None
             if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                )
-                position = len(db.get(chat_id)) - 1
-                count += 1
-                msg += f"{count}. {title[:70]}\n"
-                msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
+                return None
+            return details
+
+        # the first track starts playing while the rest are still resolving,
+        # and each one is queued in playlist order as soon as it is ready
+        tail = []
+        tracks = expand(
+            result[: config.PLAYLIST_LAZY_LIMIT],
+            resolve,
+            config.PLAYLIST_FETCH_LIMIT,
+            rest=tail,
+        )
+        # closed even when queueing fails, so its lookups do not run on
+        async with aclosing(tracks):
+            async for (
+                title,
+                duration_min,
+                duration_sec,
+                thumbnail,
+                vidid,
+            ) in tracks:
+                if await is_active_chat(chat_id):
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        f"vid_{vidid}",
+                        title,
+                        duration_min,
+                        user_name,
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
                     )
-                except:
-                    raise AssistantErr(_["play_14"])
-                await Alone.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    has_spoiler=True,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
+                    position = len(db.get(chat_id)) - 1
+                    count += 1
+                    msg += f"{count}. {title[:70]}\n"
+                    msg += f"{_['play_20']} {position}\n\n"
+                else:
+                    if not forceplay:
+                        db[chat_id] = []
+                    status = True if video else None
+                    try:
+                        file_path, direct = await YouTube.download(
+                            vidid, mystic, video=status, videoid=True, progressive=True
+                        )
+                    except:
+                        raise AssistantErr(_["play_14"])
+                    await Alone.join_call(
+                        chat_id,
+                        original_chat_id,
+                        file_path,
+                        video=status,
+                        image=thumbnail,
+                        duration=duration_sec,
+                    )
+                    _record_latency(streamtype, started)
+                    await put_queue(
+                        chat_id,
+                        original_chat_id,
+                        file_path if direct else f"vid_{vidid}",
+                        title,
                         duration_min,
                         user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                        vidid,
+                        user_id,
+                        "video" if video else "audio",
+                        forceplay=forceplay,
+                    )
+                    img = await get_thumb(vidid)
+                    button = stream_markup(_, chat_id)
+                    run = await app.send_photo(
+                        original_chat_id,
+                        photo=img,
+                        has_spoiler=True,
+                        caption=_["stream_1"].format(
+                            f"https://t.me/{app.username}?start=info_{vidid}",
+                            title[:23],
+                            duration_min,
+                            user_name,
+                        ),
+                        reply_markup=InlineKeyboardMarkup(button),
+                    )
+                    db[chat_id][0]["mystic"] = run
+                    db[chat_id][0]["markup"] = "stream"
+        # the rest is only looked up once it gets near the head of the queue
+        for item in tail:
+            title, duration_min = _lazy_title(item, spotify)
+            if title is None:
+                continue
+            await put_queue_lazy(
+                chat_id,
+                original_chat_id,
+                item,
+                not spotify,
+                title,
+                duration_min,
+                user_name,
+                user_id,
+                "video" if video else "audio",
+            )
+            position = len(db.get(chat_id)) - 1
+            count += 1
+            msg += f"{count}. {title[:70]}\n"
+            msg += f"{_['play_20']} {position}\n\n"
         if count == 0:
             return
+        link = await AloneBin(msg)
+        lines = msg.count("\n")
+        if lines >= 17:
+            car = os.linesep.join(msg.split(os.linesep)[:17])
         else:
-            link = await AloneBin(msg)
-            lines = msg.count("\n")
-            if lines >= 17:
-                car = os.linesep.join(msg.split(os.linesep)[:17])
-            else:
-                car = msg
-            carbon = await Carbon.generate(car, randint(100, 10000000))
-            upl = close_markup(_)
-            return await app.send_photo(
-                original_chat_id,
-                has_spoiler=True,
-                photo=carbon,
-                caption=_["play_21"].format(position, link),
-                reply_markup=upl,
-            )
+            car = msg
+        carbon = await Carbon.generate(car, randint(100, 10000000))
+        upl = close_markup(_)
+        return await app.send_photo(
+            original_chat_id,
+            has_spoiler=True,
+            photo=carbon,
+            caption=_["play_21"].format(position, link),
+            reply_markup=upl,
+        )
     elif streamtype == "youtube":
         link = result["link"]
         vidid = result["vidid"]
@@ -149,7 +213,7 @@ async def stream(
         status = True if video else None
         try:
             file_path, direct = await YouTube.download(
-                vidid, mystic, videoid=True, video=status
+                vidid, mystic, videoid=True, video=status, progressive=True
             )
         except Exception as ex:
             print(ex)
@@ -182,7 +246,9 @@ async def stream(
                 file_path,
                 video=status,
                 image=thumbnail,
+                duration=time_to_seconds(duration_min),
             )
+            _record_latency(streamtype, started)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -238,6 +304,7 @@ async def stream(
             if not forceplay:
                 db[chat_id] = []
             await Alone.join_call(chat_id, original_chat_id, file_path, video=None)
+            _record_latency(streamtype, started)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -291,6 +358,7 @@ async def stream(
             if not forceplay:
                 db[chat_id] = []
             await Alone.join_call(chat_id, original_chat_id, file_path, video=status)
+            _record_latency(streamtype, started)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -354,6 +422,7 @@ async def stream(
                 video=status,
                 image=thumbnail if thumbnail else None,
             )
+            _record_latency(streamtype, started)
             await put_queue(
                 chat_id,
                 original_chat_id,
@@ -412,6 +481,7 @@ async def stream(
                 link,
                 video=True if video else None,
             )
+            _record_latency(streamtype, started)
             await put_queue_index(
                 chat_id,
                 original_chat_id,
@@ -0,0 +1,119 @@
+#
+# Copyright (C) 2021-2022 by TheAloneteam@Github, < https://github.com/TheAloneTeam >.
+#
+# This file is part of < https://github.com/TheAloneTeam/AloneMusic > project,
+# and is released under the "GNU v3.0 License Agreement".
+# Please see < https://github.com/TheAloneTeam/AloneMusic/blob/master/LICENSE >
+#
+# All rights reserved.
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Union
+
+URL_CACHE_SIZE = 1024
+# drop an url this many seconds before googlevideo stops accepting it
+URL_EXPIRY_MARGIN = 5 * 60
+# for urls that carry no expiry at all
+URL_DEFAULT_TTL = 60 * 60
+
+# ?expire=1700000000 on progressive urls, /expire/1700000000/ on hls manifests
+_EXPIRE = re.compile(r"[?&/]expire[=/](\d+)")
+
+
+def url_expiry(url: str) -> Union[float, None]:
+    match = _EXPIRE.search(url)
+    return float(match.group(1)) if match else None
+
+
+class StreamUrlCache:
+    """
+    Resolved googlevideo urls keyed by video id and format.
+
+    An url is served until ``URL_EXPIRY_MARGIN`` seconds before its own
+    ``expire`` time, so seeks, loops and replays reuse it instead of running
+    yt-dlp again. Concurrent misses for the same key share one resolve, and
+    an url that failed during playback is dropped with ``invalidate_url``.
+    """
+
+    def __init__(self, maxsize: int = URL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._inflight: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+    def _lookup(self, key: tuple) -> Union[str, None]:
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+        deadline, url = entry
+        if deadline < time.time():
+            self._cache.pop(key, None)
+            return None
+        self._cache.move_to_end(key)
+        return url
+
+    def put(self, video_id: str, format: str, url: str) -> None:
+        expires = url_expiry(url)
+        if expires:
+            deadline = expires - URL_EXPIRY_MARGIN
+        else:
+            deadline = time.time() + URL_DEFAULT_TTL
+        if deadline <= time.time():
+            return
+        key = (video_id, format)
+        self._cache[key] = (deadline, url)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    async def _resolve(
+        self, video_id: str, format: str, resolver: Callable[[], Awaitable[str]]
+    ) -> str:
+        url = await resolver()
+        if url:
+            self.put(video_id, format, url)
+        return url
+
+    async def get(
+        self, video_id: str, format: str, resolver: Callable[[], Awaitable[str]]
+    ) -> str:
+        key = (video_id, format)
+        url = self._lookup(key)
+        if url is not None:
+            self.hits += 1
+            return url
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._resolve(video_id, format, resolver))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def invalidate(self, video_id: str) -> None:
+        for key in [k for k in self._cache if k[0] == video_id]:
+            self._cache.pop(key, None)
+            self.invalidated += 1
+
+    def invalidate_url(self, url: str) -> None:
+        if not isinstance(url, str):
+            return
+        for key in [k for k, (_, u) in self._cache.items() if u == url]:
+            self._cache.pop(key, None)
+            self.invalidated += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+        }
+
+
+stream_urls = StreamUrlCache()
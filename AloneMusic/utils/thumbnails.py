@@ -11,10 +11,10 @@ import os
 import re
 
 import aiofiles
-import aiohttp
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
-from py_yt import VideosSearch
 
+from AloneMusic.core.http import http
+from AloneMusic.utils.metadata import thumb_url, video_meta
 from config import YOUTUBE_IMG_URL
 
 
@@ -31,32 +31,29 @@ async def get_thumb(videoid):
     if os.path.isfile(f"cache/{videoid}.png"):
         return f"cache/{videoid}.png"
 
-    url = f"https://www.youtube.com/watch?v={videoid}"
     try:
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            try:
-                title = result["title"]
-                title = re.sub(r"\W+", " ", title)
-                title = title.title()
-            except:
-                title = "Unsupported Title"
-            try:
-                duration = result["duration"]
-            except:
-                duration = "Unknown"
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-            try:
-                views = result["viewCount"]["short"]
-            except:
-                views = "Unknown Views"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail) as resp:
-                if resp.status == 200:
-                    f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
-                    await f.write(await resp.read())
-                    await f.close()
+        result = await video_meta.get(videoid)
+        try:
+            title = result["title"]
+            title = re.sub(r"\W+", " ", title)
+            title = title.title()
+        except:
+            title = "Unsupported Title"
+        try:
+            duration = result["duration"]
+        except:
+            duration = "Unknown"
+        thumbnail = thumb_url(result)
+        try:
+            views = result["viewCount"]["short"]
+        except:
+            views = "Unknown Views"
+
+        async with http.session.get(thumbnail) as resp:
+            if resp.status == 200:
+                f = await aiofiles.open(f"cache/thumb{videoid}.png", mode="wb")
+                await f.write(await resp.read())
+                await f.close()
 
         youtube = Image.open(f"cache/thumb{videoid}.png")
 
@@ -194,11 +191,8 @@ async def get_thumb(videoid):
 
 async def get_qthumb(vidid):
     try:
-        url = f"https://www.youtube.com/watch?v={vidid}"
-        results = VideosSearch(url, limit=1)
-        for result in (await results.next())["result"]:
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        return thumbnail
+        result = await video_meta.get(vidid)
+        return thumb_url(result)
     except Exception as e:
         print(e)
         return YOUTUBE_IMG_URL
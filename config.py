@@ -64,6 +64,8 @@ SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", None)
 
 # Maximum limit for fetching playlist's track from youtube, spotify, apple links.
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 25))
+# Tracks past PLAYLIST_FETCH_LIMIT are queued unresolved, up to this many in total.
+PLAYLIST_LAZY_LIMIT = int(getenv("PLAYLIST_LAZY_LIMIT", 500))
 
 
 # Telegram audio and video file size limit (in bytes)
@@ -71,6 +73,22 @@ TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
 TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 # Checkout https://www.gbmb.org/mb-to-bytes for converting mb to bytes
 
+# Disk budget (in bytes) for downloaded tracks kept in downloads/ between plays
+DOWNLOADS_CACHE_LIMIT = int(getenv("DOWNLOADS_CACHE_LIMIT", 5368709120))
+
+# Disk budget (in bytes) for the sped up video variants kept in playback/
+PLAYBACK_CACHE_LIMIT = int(getenv("PLAYBACK_CACHE_LIMIT", 1073741824))
+
+# How many upcoming queue entries are downloaded ahead of time, how many of
+# those downloads may run at once, and their shared speed cap in bytes/sec (0 = no cap)
+PREFETCH_AHEAD = int(getenv("PREFETCH_AHEAD", 2))
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", 3))
+PREFETCH_RATE = int(getenv("PREFETCH_RATE", 8388608))
+
+# Processes used for yt-dlp extraction, and how long (in seconds) a lookup may wait for one
+EXTRACT_WORKERS = int(getenv("EXTRACT_WORKERS", 4))
+EXTRACT_TIMEOUT = int(getenv("EXTRACT_TIMEOUT", 60))
+
 
 # Get your pyrogram v2 session from @StringFatherBot on Telegram
 STRING1 = getenv("STRING_SESSION", None)
@@ -78,13 +96,19 @@ STRING2 = getenv("STRING_SESSION2", None)
 STRING3 = getenv("STRING_SESSION3", None)
 STRING4 = getenv("STRING_SESSION4", None)
 STRING5 = getenv("STRING_SESSION5", None)
+# Any number of further assistants: STRING_SESSION6, STRING_SESSION7, ... up to
+# the first one that is not set. Assistant N always uses STRING_SESSION<N>.
+STRING_SESSIONS = [STRING1, STRING2, STRING3, STRING4, STRING5]
+while getenv(f"STRING_SESSION{len(STRING_SESSIONS) + 1}"):
+    STRING_SESSIONS.append(getenv(f"STRING_SESSION{len(STRING_SESSIONS) + 1}"))
+# Calls one assistant is given before new chats go to the others (a video call counts as three)
+ASSISTANT_CAPACITY = int(getenv("ASSISTANT_CAPACITY", 25))
 
 
 BANNED_USERS = filters.user()
 adminlist = {}
 lyrical = {}
 votemode = {}
-autoclean = []
 confirmer = {}
 
 